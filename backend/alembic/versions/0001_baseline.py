@@ -0,0 +1,153 @@
+"""Исходная схема (до миграций таблицы создавал create_all при импорте приложения)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Таблицы с индексом по id (Column(..., index=True)), как их создавал create_all
+ID_INDEXED_TABLES = (
+    'faculties', 'groups', 'students', 'sport_types', 'users', 'judges', 'teachers', 'teams',
+    'competitions', 'student_performances', 'faculty_competition_results', 'faculty_total_points',
+)
+
+
+def upgrade():
+    # База, созданная create_all до появления миграций, уже содержит эти таблицы
+    if sa.inspect(op.get_bind()).has_table('students'):
+        return
+
+    op.create_table(
+        'faculties',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('name', sa.String, nullable=False, unique=True),
+        sa.Column('abbreviation', sa.String, nullable=False, unique=True),
+    )
+    op.create_table(
+        'groups',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('number', sa.String, nullable=False),
+        sa.Column('faculty_id', sa.Integer, sa.ForeignKey('faculties.id')),
+    )
+    op.create_table(
+        'students',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('first_name', sa.String, nullable=False),
+        sa.Column('last_name', sa.String, nullable=False),
+        sa.Column('middle_name', sa.String),
+        sa.Column('gender', sa.Enum('MALE', 'FEMALE', name='gender'), nullable=False),
+        sa.Column('group_id', sa.Integer, sa.ForeignKey('groups.id')),
+    )
+    op.create_table(
+        'sport_types',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('name', sa.String, nullable=False, unique=True),
+    )
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('first_name', sa.String, nullable=False),
+        sa.Column('last_name', sa.String, nullable=False),
+        sa.Column('middle_name', sa.String),
+        sa.Column('username', sa.String, nullable=False),
+        sa.Column('hashed_password', sa.String, nullable=False),
+        sa.Column('role', sa.Enum('ADMIN', 'JUDGE', 'TEACHER', name='userrole'), nullable=False),
+    )
+    op.create_index('ix_users_username', 'users', ['username'], unique=True)
+    op.create_table(
+        'judges',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('user_id', sa.Integer, sa.ForeignKey('users.id'), unique=True),
+        sa.Column('sport_type_id', sa.Integer, sa.ForeignKey('sport_types.id')),
+    )
+    op.create_table(
+        'teachers',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('user_id', sa.Integer, sa.ForeignKey('users.id'), unique=True),
+        sa.Column('faculty_id', sa.Integer, sa.ForeignKey('faculties.id')),
+        sa.Column('group_id', sa.Integer, sa.ForeignKey('groups.id')),
+    )
+    op.create_table(
+        'teams',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('sport_type_id', sa.Integer, sa.ForeignKey('sport_types.id')),
+        sa.Column('faculty_id', sa.Integer, sa.ForeignKey('faculties.id')),
+    )
+    op.create_table(
+        'team_students',
+        sa.Column('team_id', sa.Integer, sa.ForeignKey('teams.id'), primary_key=True),
+        sa.Column('student_id', sa.Integer, sa.ForeignKey('students.id'), primary_key=True),
+    )
+    op.create_table(
+        'competitions',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('name', sa.String, nullable=False),
+        sa.Column('sport_type_id', sa.Integer, sa.ForeignKey('sport_types.id')),
+        sa.Column('date', sa.DateTime, nullable=False),
+        sa.Column('location', sa.String, nullable=False),
+    )
+    op.create_table(
+        'competition_teams',
+        sa.Column('competition_id', sa.Integer, sa.ForeignKey('competitions.id'), primary_key=True),
+        sa.Column('team_id', sa.Integer, sa.ForeignKey('teams.id'), primary_key=True),
+    )
+    op.create_table(
+        'student_performances',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('student_id', sa.Integer, sa.ForeignKey('students.id')),
+        sa.Column('sport_type_id', sa.Integer, sa.ForeignKey('sport_types.id')),
+        sa.Column('competition_id', sa.Integer, sa.ForeignKey('competitions.id')),
+        sa.Column('judge_id', sa.Integer, sa.ForeignKey('judges.id')),
+        sa.Column('points', sa.Float, nullable=False),
+        sa.Column('time_result', sa.String),
+        sa.Column('original_result', sa.Float),
+        sa.UniqueConstraint('student_id', 'competition_id', name='_student_competition_uc'),
+    )
+    op.create_table(
+        'faculty_competition_results',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('faculty_id', sa.Integer, sa.ForeignKey('faculties.id')),
+        sa.Column('sport_type_id', sa.Integer, sa.ForeignKey('sport_types.id')),
+        sa.Column('total_points', sa.Float, nullable=False),
+        sa.Column('place', sa.Integer),
+        sa.UniqueConstraint('faculty_id', 'sport_type_id', name='_faculty_sport_uc'),
+    )
+    op.create_table(
+        'faculty_result_performances',
+        sa.Column('faculty_result_id', sa.Integer, sa.ForeignKey('faculty_competition_results.id'), primary_key=True),
+        sa.Column('performance_id', sa.Integer, sa.ForeignKey('student_performances.id'), primary_key=True),
+    )
+    op.create_table(
+        'faculty_total_points',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('faculty_id', sa.Integer, sa.ForeignKey('faculties.id'), unique=True),
+        sa.Column('total_points', sa.Float, nullable=False),
+        sa.Column('overall_place', sa.Integer),
+    )
+    op.create_table(
+        'total_points_results',
+        sa.Column('total_points_id', sa.Integer, sa.ForeignKey('faculty_total_points.id'), primary_key=True),
+        sa.Column('faculty_result_id', sa.Integer, sa.ForeignKey('faculty_competition_results.id'), primary_key=True),
+    )
+
+    for table in ID_INDEXED_TABLES:
+        op.create_index(f'ix_{table}_id', table, ['id'])
+
+
+def downgrade():
+    for table in (
+            'total_points_results', 'faculty_total_points', 'faculty_result_performances',
+            'faculty_competition_results', 'student_performances', 'competition_teams', 'competitions',
+            'team_students', 'teams', 'teachers', 'judges', 'users', 'sport_types', 'students',
+            'groups', 'faculties',
+    ):
+        op.drop_table(table)
+    sa.Enum(name='userrole').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='gender').drop(op.get_bind(), checkfirst=True)
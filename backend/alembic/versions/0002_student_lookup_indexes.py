@@ -0,0 +1,23 @@
+"""Индексы поиска студента по ФИО и групп факультета (find-or-create)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_students_identity', 'students', ['last_name', 'first_name', 'gender'], if_not_exists=True)
+    op.create_index('ix_groups_faculty_id', 'groups', ['faculty_id'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_groups_faculty_id', table_name='groups')
+    op.drop_index('ix_students_identity', table_name='students')
@@ -0,0 +1,78 @@
+"""Нормализованный результат выступления (result_value) и его заполнение
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def time_to_seconds(time_str):
+    """Время вида "0:01:23.45" в секундах (как app.utils.ranking на момент миграции)"""
+    parts = time_str.split(':')
+    if len(parts) == 3:
+        return int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
+    return float(time_str)
+
+
+def is_time_based_sport(sport_name):
+    return any(word in sport_name.lower() for word in ['бег', 'плавание'])
+
+
+def normalize_result(time_result, original_result, lower_is_better):
+    if lower_is_better:
+        if time_result:
+            return time_to_seconds(time_result)
+        return original_result
+    return -(original_result or 0)
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'result_value' not in {column['name'] for column in inspector.get_columns('student_performances')}:
+        op.add_column('student_performances', sa.Column('result_value', sa.Float))
+    op.create_index(
+        'ix_student_performances_sport_result', 'student_performances', ['sport_type_id', 'result_value'],
+        if_not_exists=True
+    )
+
+    # Правило "меньше - лучше" из столбца вида спорта (если он уже есть) или по названию
+    has_rules = 'lower_is_better' in {column['name'] for column in inspector.get_columns('sport_types')}
+    sports = bind.execute(sa.text(
+        "SELECT id, name, lower_is_better FROM sport_types" if has_rules else "SELECT id, name, NULL FROM sport_types"
+    )).all()
+    lower_is_better = {
+        sport_id: is_time_based_sport(name) if rule is None else rule
+        for sport_id, name, rule in sports
+    }
+
+    rows = bind.execute(sa.text(
+        "SELECT id, sport_type_id, time_result, original_result FROM student_performances "
+        "WHERE result_value IS NULL"
+    )).all()
+    updates = []
+    for performance_id, sport_type_id, time_result, original_result in rows:
+        try:
+            value = normalize_result(time_result, original_result, lower_is_better.get(sport_type_id, False))
+        except ValueError:
+            continue  # Неразборчивое время остается без результата (последние места)
+        if value is not None:
+            updates.append({"id": performance_id, "value": value})
+
+    update = sa.text("UPDATE student_performances SET result_value = :value WHERE id = :id")
+    for start in range(0, len(updates), BATCH_SIZE):
+        bind.execute(update, updates[start:start + BATCH_SIZE])
+
+
+def downgrade():
+    op.drop_index('ix_student_performances_sport_result', table_name='student_performances')
+    op.drop_column('student_performances', 'result_value')
@@ -0,0 +1,36 @@
+"""Правила подсчета вида спорта в sport_types
+
+Пустые значения новых столбцов выводятся из названия вида спорта
+(см. app/utils/sport_registry.py), поэтому существующие виды спорта
+считаются так же, как до миграции.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    ('is_team', sa.Boolean),
+    ('lower_is_better', sa.Boolean),
+    ('tie_tolerance', sa.Float),
+    ('points_table', sa.JSON),
+)
+
+
+def upgrade():
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('sport_types')}
+    for name, column_type in COLUMNS:
+        if name not in existing:
+            op.add_column('sport_types', sa.Column(name, column_type))
+
+
+def downgrade():
+    for name, _ in reversed(COLUMNS):
+        op.drop_column('sport_types', name)
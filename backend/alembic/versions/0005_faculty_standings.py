@@ -0,0 +1,56 @@
+"""Суммы баллов факультетов по виду спорта и полу (faculty_standings) и их заполнение
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+# Тип gender создан вместе с таблицей students
+GENDER = sa.Enum('MALE', 'FEMALE', name='gender').with_variant(
+    postgresql.ENUM('MALE', 'FEMALE', name='gender', create_type=False), 'postgresql'
+)
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('faculty_standings'):
+        return
+
+    op.create_table(
+        'faculty_standings',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('faculty_id', sa.Integer, sa.ForeignKey('faculties.id'), nullable=False),
+        sa.Column('sport_type_id', sa.Integer, sa.ForeignKey('sport_types.id'), nullable=False),
+        sa.Column('gender', GENDER, nullable=False),
+        sa.Column('total_points', sa.Float, nullable=False),
+        sa.UniqueConstraint('faculty_id', 'sport_type_id', 'gender', name='_faculty_sport_gender_uc'),
+    )
+    op.create_index('ix_faculty_standings_id', 'faculty_standings', ['id'])
+    op.create_index(
+        'ix_faculty_standings_sport_gender_points', 'faculty_standings', ['sport_type_id', 'gender', 'total_points']
+    )
+
+    # Строка для каждого факультета, вида спорта и пола, как их поддерживает запись результатов
+    for gender in ('MALE', 'FEMALE'):
+        op.get_bind().execute(sa.text(
+            "INSERT INTO faculty_standings (faculty_id, sport_type_id, gender, total_points) "
+            "SELECT faculties.id, sport_types.id, :gender, COALESCE(("
+            "    SELECT SUM(student_performances.points) FROM student_performances"
+            "    JOIN students ON students.id = student_performances.student_id"
+            "    JOIN groups ON groups.id = students.group_id"
+            "    WHERE groups.faculty_id = faculties.id"
+            "    AND student_performances.sport_type_id = sport_types.id"
+            "    AND students.gender = :gender"
+            "), 0) FROM faculties CROSS JOIN sport_types"
+        ), {"gender": gender})
+
+
+def downgrade():
+    op.drop_table('faculty_standings')
@@ -0,0 +1,45 @@
+"""Факультет и пол участника в student_performances и их заполнение
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+# Тип gender создан вместе с таблицей students
+GENDER = sa.Enum('MALE', 'FEMALE', name='gender').with_variant(
+    postgresql.ENUM('MALE', 'FEMALE', name='gender', create_type=False), 'postgresql'
+)
+
+
+def upgrade():
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('student_performances')}
+    if 'faculty_id' not in existing:
+        op.add_column('student_performances', sa.Column('faculty_id', sa.Integer, sa.ForeignKey('faculties.id')))
+    if 'gender' not in existing:
+        op.add_column('student_performances', sa.Column('gender', GENDER))
+    op.create_index(
+        'ix_student_performances_sport_gender_faculty', 'student_performances',
+        ['sport_type_id', 'gender', 'faculty_id'], if_not_exists=True
+    )
+
+    # Один раз то же, что sync_performers: без снимка выступления не попадают в ранжирование и рейтинги
+    op.execute(
+        "UPDATE student_performances "
+        "SET faculty_id = groups.faculty_id, gender = students.gender "
+        "FROM students LEFT JOIN groups ON groups.id = students.group_id "
+        "WHERE students.id = student_performances.student_id AND student_performances.gender IS NULL"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_student_performances_sport_gender_faculty', table_name='student_performances')
+    op.drop_column('student_performances', 'gender')
+    op.drop_column('student_performances', 'faculty_id')
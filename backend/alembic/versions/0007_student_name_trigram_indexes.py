@@ -0,0 +1,55 @@
+"""Расширение pg_trgm и GIN-индексы по ФИО студентов для поиска
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+# Те же имена проверяет app.utils.student_search при старте
+TRIGRAM_INDEXES = {
+    'ix_students_last_name_trgm': 'last_name',
+    'ix_students_first_name_trgm': 'first_name',
+    'ix_students_middle_name_trgm': 'middle_name',
+}
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    if not bind.execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).first():
+        logger.warning("pg_trgm is not available, student search stays on the in-memory index")
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CONCURRENTLY не блокирует запись в students, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        for index_name, column in TRIGRAM_INDEXES.items():
+            # Недостроенный (INVALID) индекс после прерванной миграции строится заново
+            op.execute(
+                f"DO $$ BEGIN IF EXISTS (SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                f"WHERE c.relname = '{index_name}' AND NOT i.indisvalid) "
+                f"THEN DROP INDEX {index_name}; END IF; END $$"
+            )
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON students USING gin ({column} gin_trgm_ops)"
+            )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        for index_name in TRIGRAM_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
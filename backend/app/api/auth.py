@@ -1,4 +1,8 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from jose import JWTError, jwt
@@ -10,21 +14,66 @@ from ..database import get_db
 from ..models import User
 from ..schemas import UserCreate, UserLogin, Token
 from ..config import settings
+from ..utils.principal_cache import Principal, principal_cache
 
 router = APIRouter()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Хэши с другой стоимостью считаются устаревшими и пересчитываются при входе
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# bcrypt выполняется в отдельном ограниченном пуле, чтобы волна входов
+# не занимала пул потоков, который обслуживает остальные запросы
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password):
+    # Для скриптов (заполнение базы, генератор данных); эндпоинты хэшируют
+    # через hash_password_async, не занимая пул потоков запросов
     return pwd_context.hash(password)
 
 
+async def hash_password_async(password):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.hash, password)
+
+
+async def verify_password_async(plain_password, hashed_password):
+    """Проверить пароль в пуле bcrypt; вернуть (верен ли пароль, новый хэш или None)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
+def get_login_credentials(db: Session, username: str):
+    """
+    Прочитать данные для входа и сразу вернуть соединение в пул:
+    проверка пароля может долго ждать очереди в пуле bcrypt.
+    """
+    row = db.query(User.id, User.username, User.hashed_password, User.role).filter(User.username == username).first()
+    db.rollback()
+    return row
+
+
+def save_password_hash(db: Session, user_id: int, hashed_password: str):
+    db.query(User).filter(User.id == user_id).update({User.hashed_password: hashed_password})
+    db.commit()
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -36,7 +85,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -49,16 +98,24 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+
+    # Повторные запросы с тем же токеном обходятся без обращения к базе данных
+    expires_at = payload.get("exp")
+    principal = principal_cache.get((username, expires_at))
+    if principal is not None:
+        return principal
+
     user = db.query(User).filter(User.username == username).first()
     if user is None:
         raise credentials_exception
-    return user
+    principal = Principal.from_model(user)
+    principal_cache.put((username, expires_at), principal, expires_at)
+    return principal
 
 
 @router.post("/register", response_model=Token)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.username == user.username).first()
-    if db_user:
+async def register(user: UserCreate, db: Session = Depends(get_db)):
+    if await run_in_threadpool(get_login_credentials, db, user.username):
         raise HTTPException(status_code=400, detail="Username already registered")
 
     db_user = User(
@@ -66,12 +123,12 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         last_name=user.last_name,
         middle_name=user.middle_name,
         username=user.username,
-        hashed_password=get_password_hash(user.password),
+        hashed_password=await hash_password_async(user.password),
         role=user.role
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await run_in_threadpool(db.commit)
+    await run_in_threadpool(db.refresh, db_user)
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -86,14 +143,20 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = await run_in_threadpool(get_login_credentials, db, form_data.username)
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await verify_password_async(form_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # Стоимость bcrypt изменилась в настройках: пересохраняем хэш
+        await run_in_threadpool(save_password_hash, db, user.id, new_hash)
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
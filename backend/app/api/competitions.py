@@ -1,43 +1,51 @@
 # backend/app/api/competitions.py - ОБНОВЛЕННАЯ ВЕРСИЯ
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from ..database import get_db
-from ..models import Competition, SportType, Team, Faculty, Group
+from ..database import get_async_db, get_db, get_read_db
+from ..models import Competition, Team, Group
 from ..schemas import CompetitionCreate, CompetitionRead, SportTypeRead, FacultyRead, GroupRead
+from ..utils.pagination import PageParams, paginated_response
+from ..utils.reference_data import reference_data
 
 router = APIRouter()
 
+# Размер страницы списка соревнований по умолчанию
+DEFAULT_PAGE_SIZE = 100
+
 
 @router.get("/sport-types/", response_model=List[SportTypeRead])
-def get_sport_types(db: Session = Depends(get_db)):
-    sport_types = db.query(SportType).all()
-    return sport_types
+async def get_sport_types(db: AsyncSession = Depends(get_read_db)):
+    return (await reference_data.fresh(db)).sport_types
 
 
 @router.get("/", response_model=List[CompetitionRead])
-def get_competitions(
-        skip: int = 0,
-        limit: int = 100,
+async def get_competitions(
         sport_type_id: Optional[int] = Query(None),
-        db: Session = Depends(get_db)
+        page: PageParams = Depends(),
+        db: AsyncSession = Depends(get_read_db)
 ):
-    query = db.query(Competition)
+    query = select(Competition)
 
     if sport_type_id:
-        query = query.filter(Competition.sport_type_id == sport_type_id)
+        query = query.where(Competition.sport_type_id == sport_type_id)
 
-    competitions = query.offset(skip).limit(limit).all()
-    return competitions
+    return await paginated_response(
+        db, query, (Competition.id,),
+        lambda competition: CompetitionRead.model_validate(competition).model_dump(mode="json"),
+        page, scalars=True, default_limit=DEFAULT_PAGE_SIZE
+    )
 
 
 @router.get("/by-sport/{sport_type_id}")
-def get_competition_by_sport(sport_type_id: int, db: Session = Depends(get_db)):
+async def get_competition_by_sport(sport_type_id: int, db: AsyncSession = Depends(get_async_db)):
     """Получить активное соревнование по виду спорта"""
-    competition = db.query(Competition).filter(
-        Competition.sport_type_id == sport_type_id
-    ).first()
+    competition = (await db.scalars(
+        select(Competition).where(Competition.sport_type_id == sport_type_id).limit(1)
+    )).first()
 
     if not competition:
         raise HTTPException(status_code=404, detail="Соревнование не найдено")
@@ -77,18 +85,26 @@ def create_competition(
 
 
 @router.get("/faculties/", response_model=List[FacultyRead])
-def get_faculties(db: Session = Depends(get_db)):
-    faculties = db.query(Faculty).all()
-    return faculties
+async def get_faculties(db: AsyncSession = Depends(get_read_db)):
+    return (await reference_data.fresh(db)).faculties
 
 
 @router.get("/groups/", response_model=List[GroupRead])
-def get_groups(
+async def get_groups(
         faculty_id: int = None,
-        db: Session = Depends(get_db)
+        page: PageParams = Depends(),
+        db: AsyncSession = Depends(get_read_db)
 ):
-    query = db.query(Group)
+    if not (page.cursor or page.limit or page.stream):
+        # Весь список - из справочника в памяти
+        groups = (await reference_data.fresh(db)).groups
+        return [group for group in groups if not faculty_id or group["faculty_id"] == faculty_id]
+
+    query = select(Group)
     if faculty_id:
-        query = query.filter(Group.faculty_id == faculty_id)
-    groups = query.all()
-    return groups
\ No newline at end of file
+        query = query.where(Group.faculty_id == faculty_id)
+    return await paginated_response(
+        db, query, (Group.number, Group.id),
+        lambda group: GroupRead.model_validate(group).model_dump(mode="json"),
+        page, scalars=True
+    )
\ No newline at end of file
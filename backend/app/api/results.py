@@ -1,175 +1,127 @@
 # backend/app/api/results.py - ИСПРАВЛЕННАЯ ВЕРСИЯ с правильным группированием команд по полу
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+import csv
+import io
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload, selectinload
-from sqlalchemy import func, and_, desc, asc
+from pydantic import ValidationError
+from sqlalchemy import func, and_, desc, asc, cast, insert, literal, select, union_all, update, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from typing import List, Optional
 
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..models.student import Gender
 from ..models import (
-    StudentPerformance, FacultyCompetitionResult, FacultyTotalPoints,
-    Student, Faculty, SportType, Competition, Team, Group
+    StudentPerformance, FacultyCompetitionResult, FacultyStanding, FacultyTotalPoints,
+    Student, Faculty, SportType, Competition, Team, Group, Judge
 )
 from ..schemas import (
     StudentPerformanceCreate, StudentPerformanceRead, StudentPerformanceUpdate,
     FacultyCompetitionResultRead, FacultyTotalPointsRead,
-    CompetitionResultsFilter, StudentPerformanceDetail
+    CompetitionResultsFilter, StudentPerformanceDetail,
+    PerformanceImportRow, PerformanceImportResult, StudentFindOrCreateRequest
+)
+from ..api.students import find_or_create_students
+from ..utils.ranking import (
+    normalize_result, rank_key, rank_places, normalize_results, sync_performers, score_sport,
+    load_ranking_board, apply_points
 )
+from ..utils.sport_registry import sport_registry
+from ..utils.standings_cache import standings_cache, cached_standings_response
+from ..utils.live_hub import live_hub
+from ..utils.metrics import recalculations, timed
 
 router = APIRouter()
 
+# Интервал служебных сообщений в потоке результатов, секунды
+STREAM_KEEPALIVE_SECONDS = 15
 
-def get_points_for_place(place):
-    """Получить баллы за место согласно правилам спартакиады"""
-    if place <= 10:
-        return 11 - place  # 1 место = 10 баллов, 2 место = 9 баллов, ..., 10 место = 1 балл
-    else:
-        return 1  # 11+ места = 1 балл
 
+@timed("recalculate_competition_points")
+def recalculate_competition_points(db: Session, sport_type_id: int):
+    """
+    Пересчитать баллы для всех участников соревнования с раздельным подсчетом по полу.
+    Возвращает баллы изменившихся выступлений. Транзакцию фиксирует вызывающий код.
+    """
 
-def is_team_sport(sport_name):
-    """Определить, является ли вид спорта командным"""
-    team_sports = ['Баскетбол', 'Волейбол', 'Футбол']
-    return any(sport in sport_name for sport in team_sports)
-
+    # Получаем правила вида спорта
+    scoring = sport_registry.get(db, sport_type_id)
+    if not scoring:
+        return {}
+    recalculations.inc()
 
-def recalculate_competition_points(db: Session, sport_type_id: int):
-    """Пересчитать баллы для всех участников соревнования с раздельным подсчетом по полу"""
+    # Заново нормализуем результаты на случай изменения формата или правил вида спорта
+    normalize_results(db, sport_type_id, scoring)
+    # Факультет и пол участников - по текущим данным студентов (и заполнение старых записей)
+    sync_performers(db, sport_type_id)
 
-    # Получаем вид спорта
-    sport_type = db.query(SportType).filter(SportType.id == sport_type_id).first()
-    if not sport_type:
-        return
+    # Места и баллы считаются раздельно для каждого пола
+    changed = score_sport(db, sport_type_id, scoring)
+    apply_points(db, changed)
+    return changed
 
-    # Получаем все выступления по данному виду спорта
-    performances = db.query(StudentPerformance).filter(
-        StudentPerformance.sport_type_id == sport_type_id
-    ).join(Student).join(Group).join(Faculty).all()
 
-    if not performances:
-        return
-
-    is_team = is_team_sport(sport_type.name)
-    is_time_based = any(word in sport_type.name.lower() for word in ['бег', 'плавание'])
-
-    if is_team:
-        # КОМАНДНЫЕ ВИДЫ СПОРТА - раздельно по полу
-        # Разделяем команды по полу
-        male_performances = [p for p in performances if p.student.gender.value == "М"]
-        female_performances = [p for p in performances if p.student.gender.value == "Ж"]
-
-        for gender_performances in [male_performances, female_performances]:
-            if not gender_performances:
-                continue
-
-            # Группируем по факультетам внутри каждого пола
-            faculty_performances = {}
-            for perf in gender_performances:
-                faculty_id = perf.student.group.faculty_id
-                if faculty_id not in faculty_performances:
-                    faculty_performances[faculty_id] = []
-                faculty_performances[faculty_id].append(perf)
-
-            # Сортируем команды по результатам
-            faculty_results = []
-            for faculty_id, perfs in faculty_performances.items():
-                if is_time_based and perfs[0].time_result:
-                    # Конвертируем время в секунды для сортировки
-                    time_parts = perfs[0].time_result.split(':')
-                    if len(time_parts) == 3:
-                        total_seconds = int(time_parts[0]) * 3600 + int(time_parts[1]) * 60 + float(time_parts[2])
-                    else:
-                        total_seconds = float(perfs[0].time_result)
-                    sort_key = total_seconds
-                else:
-                    # Для очковых видов используем original_result
-                    sort_key = -(perfs[0].original_result or 0)  # Отрицательное для сортировки по убыванию
-
-                faculty_results.append((faculty_id, perfs, sort_key))
-
-            # Сортируем команды одного пола
-            faculty_results.sort(key=lambda x: x[2])
-
-            # Присваиваем места и баллы внутри пола
-            for place, (faculty_id, perfs, _) in enumerate(faculty_results, 1):
-                points = get_points_for_place(place)
-                # Всем членам команды одинаковые баллы
-                for perf in perfs:
-                    perf.points = points
+def lock_sport_scoring(db: Session, sport_type_id: int):
+    """Правила вида спорта (None - вида спорта нет); строка вида спорта блокируется до конца транзакции"""
+    # Блокировка вида спорта упорядочивает одновременные записи в одну таблицу
+    if not db.query(SportType.id).filter(SportType.id == sport_type_id).with_for_update().first():
+        return None
+    return sport_registry.get(db, sport_type_id)
 
-    else:
-        # ИНДИВИДУАЛЬНЫЕ ВИДЫ СПОРТА - раздельно по полу
-        # Разделяем участников по полу
-        male_performances = [p for p in performances if p.student.gender.value == "М"]
-        female_performances = [p for p in performances if p.student.gender.value == "Ж"]
-
-        for gender_performances in [male_performances, female_performances]:
-            if not gender_performances:
-                continue
-
-            if is_time_based:
-                # Сортируем по времени (меньше = лучше)
-                def time_to_seconds(time_str):
-                    if not time_str:
-                        return float('inf')
-                    parts = time_str.split(':')
-                    if len(parts) == 3:
-                        return int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
-                    return float(time_str)
-
-                gender_performances.sort(key=lambda p: time_to_seconds(p.time_result))
-            else:
-                # Сортируем по исходному результату (больше = лучше)
-                gender_performances.sort(key=lambda p: p.original_result or 0, reverse=True)
-
-            # Присваиваем места и пересчитываем баллы внутри пола
-            current_place = 1
-            for i, performance in enumerate(gender_performances):
-                if i > 0:
-                    prev_perf = gender_performances[i - 1]
-                    if is_time_based:
-                        if performance.time_result != prev_perf.time_result:
-                            current_place = i + 1
-                    else:
-                        # Сравниваем исходные результаты
-                        if (performance.original_result or 0) != (prev_perf.original_result or 0):
-                            current_place = i + 1
-
-                # Присваиваем баллы согласно месту внутри пола
-                performance.points = get_points_for_place(current_place)
 
-    db.commit()
+def find_performer(db: Session, student_id: int):
+    """Пол и факультет студента (faculty_id пустой - студент без группы не участвует в зачете)"""
+    return db.query(Student.gender, Group.faculty_id).outerjoin(
+        Group, Student.group_id == Group.id
+    ).filter(Student.id == student_id).first()
 
 
-@router.get("/competition-results/", response_model=List[dict])
-def get_competition_results(
-        sport_type_id: Optional[int] = Query(None),
-        gender: Optional[str] = Query(None),
-        db: Session = Depends(get_db)
-):
+def build_competition_results(db: Session, sport_type_id: Optional[int], gender: Optional[Gender]):
     """
-    Получить результаты соревнований
+    Построить протокол соревнований (синхронный код: эндпоинт вызывает его через AsyncSession.run_sync)
     При gender=None показывает общий протокол с абсолютными результатами И баллами
     При gender=М/Ж показывает раздельный подсчет с баллами за места
     """
-    # Базовый запрос
-    query = db.query(StudentPerformance).join(
-        Student
+    # Один запрос с плоским набором столбцов: без ORM-объектов и ленивых загрузок
+    query = db.query(
+        StudentPerformance.id,
+        StudentPerformance.sport_type_id,
+        StudentPerformance.faculty_id,
+        StudentPerformance.gender,
+        StudentPerformance.points,
+        StudentPerformance.time_result,
+        StudentPerformance.original_result,
+        StudentPerformance.result_value,
+        Student.id.label('student_id'),
+        Student.last_name,
+        Student.first_name,
+        Student.middle_name,
+        Faculty.name.label('faculty_name'),
+        Faculty.abbreviation.label('faculty_abbreviation'),
+        SportType.name.label('sport_type_name')
+    ).join(
+        Student, StudentPerformance.student_id == Student.id
     ).join(
-        Group
+        # Студенты без группы (faculty_id пустой) не участвуют в зачете
+        Faculty, StudentPerformance.faculty_id == Faculty.id
     ).join(
-        Faculty
-    ).options(
-        joinedload(StudentPerformance.student),
-        joinedload(StudentPerformance.sport_type)
+        SportType, StudentPerformance.sport_type_id == SportType.id
+    ).order_by(
+        # Нормализованный результат: чем меньше, тем выше место
+        StudentPerformance.result_value.asc().nullslast(),
+        StudentPerformance.id
     )
 
+    # Баллы пересчитываются при записи результатов, здесь только чтение
     if sport_type_id:
         query = query.filter(StudentPerformance.sport_type_id == sport_type_id)
-        # Пересчитываем баллы для этого вида спорта (нужно для раздельного подсчета)
-        recalculate_competition_points(db, sport_type_id)
 
     if gender:
-        query = query.filter(Student.gender == gender)
+        query = query.filter(StudentPerformance.gender == gender)
 
     performances = query.all()
 
@@ -177,371 +129,211 @@ def get_competition_results(
         return []
 
     # Определяем тип спорта
-    sport_type = performances[0].sport_type if performances else None
-    is_team = sport_type and is_team_sport(sport_type.name)
-    is_time_based = sport_type and any(word in sport_type.name.lower() for word in ['бег', 'плавание'])
+    scoring = sport_registry.get(db, performances[0].sport_type_id)
+    is_team = scoring and scoring.is_team
+
+    def result_row(perf, place, faculty_abbreviation, is_team_sport):
+        student_name = f"{perf.last_name} {perf.first_name[0]}."
+        if perf.middle_name:
+            student_name += f"{perf.middle_name[0]}."
+        if not gender and not is_team_sport:
+            # В общем протоколе к имени добавляется пол
+            student_name = f"{student_name} ({perf.gender.value})"
+
+        return {
+            "place": place,
+            "faculty_id": perf.faculty_id,
+            "faculty_name": perf.faculty_name,
+            "faculty_abbreviation": faculty_abbreviation or perf.faculty_abbreviation,
+            "student_id": perf.student_id,
+            "student_name": student_name,
+            "gender": perf.gender.value,
+            "time_result": perf.time_result,
+            "points": perf.points,
+            "performance_id": perf.id,
+            "sport_type_id": perf.sport_type_id,
+            "sport_type_name": perf.sport_type_name,
+            "is_team_sport": is_team_sport,
+            "original_result": perf.original_result
+        }
+
+    if is_team and sport_type_id:
+        # Командные виды спорта - команда это факультет внутри пола
+        teams = {}
+        for perf in performances:
+            teams.setdefault((perf.faculty_id, perf.gender), []).append(perf)
+        members = list(teams.values())
 
-    results = []
-
-    if gender:
-        # РАЗДЕЛЬНЫЙ ПОДСЧЕТ ПО ПОЛУ - показываем баллы за места внутри пола
-        if is_team and sport_type_id:
-            # Командные виды спорта для одного пола - группируем по факультетам
-            faculty_performances = {}
-            for perf in performances:
-                faculty_id = perf.student.group.faculty_id
-                if faculty_id not in faculty_performances:
-                    faculty_performances[faculty_id] = {
-                        'faculty': perf.student.group.faculty,
-                        'performances': [],
-                        'points': perf.points
-                    }
-                faculty_performances[faculty_id]['performances'].append(perf)
-
-            # Сортируем команды по баллам
-            sorted_faculties = sorted(faculty_performances.items(),
-                                      key=lambda x: x[1]['points'],
-                                      reverse=True)
-
-            # Определяем места
-            current_place = 1
-            for i, (faculty_id, data) in enumerate(sorted_faculties):
-                if i > 0:
-                    prev_points = sorted_faculties[i - 1][1]['points']
-                    if data['points'] != prev_points:
-                        current_place = i + 1
-
-                # Добавляем результаты для каждого члена команды
-                for perf in data['performances']:
-                    student = perf.student
-                    student_name = f"{student.last_name} {student.first_name[0]}."
-                    if student.middle_name:
-                        student_name += f"{student.middle_name[0]}."
-
-                    results.append({
-                        "place": current_place,
-                        "faculty_id": faculty_id,
-                        "faculty_name": data['faculty'].name,
-                        "faculty_abbreviation": data['faculty'].abbreviation,
-                        "student_id": student.id,
-                        "student_name": student_name,
-                        "gender": student.gender.value,
-                        "time_result": perf.time_result,
-                        "points": perf.points,
-                        "performance_id": perf.id,
-                        "sport_type_id": perf.sport_type_id,
-                        "sport_type_name": perf.sport_type.name,
-                        "is_team_sport": True,
-                        "original_result": perf.original_result
-                    })
-        else:
-            # Индивидуальные виды спорта для одного пола
-            if is_time_based:
-                def time_to_seconds(time_str):
-                    if not time_str:
-                        return float('inf')
-                    parts = time_str.split(':')
-                    if len(parts) == 3:
-                        return int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
-                    return float(time_str)
-
-                performances.sort(key=lambda p: time_to_seconds(p.time_result))
-            else:
-                performances.sort(key=lambda p: p.original_result or 0, reverse=True)
-
-            # Определяем места
-            current_place = 1
-            for i, performance in enumerate(performances):
-                student = performance.student
-                faculty = student.group.faculty
-
-                if i > 0:
-                    prev_perf = performances[i - 1]
-                    if is_time_based:
-                        if performance.time_result != prev_perf.time_result:
-                            current_place = i + 1
-                    else:
-                        if (performance.original_result or 0) != (prev_perf.original_result or 0):
-                            current_place = i + 1
-
-                student_name = f"{student.last_name} {student.first_name[0]}."
-                if student.middle_name:
-                    student_name += f"{student.middle_name[0]}."
-
-                results.append({
-                    "place": current_place,
-                    "faculty_id": faculty.id,
-                    "faculty_name": faculty.name,
-                    "faculty_abbreviation": faculty.abbreviation,
-                    "student_id": student.id,
-                    "student_name": student_name,
-                    "gender": student.gender.value,
-                    "time_result": performance.time_result,
-                    "points": performance.points,
-                    "performance_id": performance.id,
-                    "sport_type_id": performance.sport_type_id,
-                    "sport_type_name": performance.sport_type.name,
-                    "is_team_sport": False,
-                    "original_result": performance.original_result
-                })
-    else:
-        # ОБЩИЙ ПРОТОКОЛ - показываем абсолютные результаты И баллы
-        if is_team and sport_type_id:
-            # Командные виды спорта - ИСПРАВЛЕНО: группируем по факультету И полу
-            faculty_performances = {}
-            for perf in performances:
-                # КЛЮЧЕВОЕ ИЗМЕНЕНИЕ: группируем по факультету И полу
-                faculty_gender_key = f"{perf.student.group.faculty_id}_{perf.student.gender.value}"
-                if faculty_gender_key not in faculty_performances:
-                    faculty_performances[faculty_gender_key] = {
-                        'faculty': perf.student.group.faculty,
-                        'gender': perf.student.gender.value,
-                        'performances': [],
-                        'original_result': perf.original_result,
-                        'time_result': perf.time_result,
-                        'points': perf.points
-                    }
-                faculty_performances[faculty_gender_key]['performances'].append(perf)
-
-            # Сортируем команды по абсолютным результатам
-            faculty_list = list(faculty_performances.items())
-            if is_time_based:
-                def time_to_seconds(time_str):
-                    if not time_str:
-                        return float('inf')
-                    parts = time_str.split(':')
-                    if len(parts) == 3:
-                        return int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
-                    return float(time_str)
-
-                faculty_list.sort(key=lambda x: time_to_seconds(x[1]['time_result']))
-            else:
-                faculty_list.sort(key=lambda x: x[1]['original_result'] or 0, reverse=True)
-
-            # Присваиваем места по абсолютным результатам
-            current_place = 1
-            for i, (key, data) in enumerate(faculty_list):
-                if i > 0:
-                    prev_data = faculty_list[i - 1][1]
-                    if is_time_based:
-                        if data['time_result'] != prev_data['time_result']:
-                            current_place = i + 1
-                    else:
-                        if (data['original_result'] or 0) != (prev_data['original_result'] or 0):
-                            current_place = i + 1
-
-                # ИСПРАВЛЕНО: показываем команду с указанием пола
-                team_name = f"{data['faculty'].abbreviation} ({data['gender']})"
-
-                for perf in data['performances']:
-                    student = perf.student
-                    student_name = f"{student.last_name} {student.first_name[0]}."
-                    if student.middle_name:
-                        student_name += f"{student.middle_name[0]}."
-
-                    results.append({
-                        "place": current_place,
-                        "faculty_id": data['faculty'].id,
-                        "faculty_name": data['faculty'].name,
-                        "faculty_abbreviation": team_name,  # Команда с указанием пола
-                        "student_id": student.id,
-                        "student_name": student_name,
-                        "gender": student.gender.value,
-                        "time_result": perf.time_result,
-                        "points": perf.points,
-                        "performance_id": perf.id,
-                        "sport_type_id": perf.sport_type_id,
-                        "sport_type_name": perf.sport_type.name,
-                        "is_team_sport": True,
-                        "original_result": perf.original_result
-                    })
+        if gender:
+            # Раздельный подсчет: команды одного пола по баллам (по убыванию)
+            order = list(range(len(members)))
+            places = rank_places([-(team[0].points or 0) for team in members], order=order)
         else:
-            # Индивидуальные виды спорта - общий протокол всех участников
-            if is_time_based:
-                def time_to_seconds(time_str):
-                    if not time_str:
-                        return float('inf')
-                    parts = time_str.split(':')
-                    if len(parts) == 3:
-                        return int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
-                    return float(time_str)
-
-                performances.sort(key=lambda p: time_to_seconds(p.time_result))
-            else:
-                performances.sort(key=lambda p: p.original_result or 0, reverse=True)
-
-            # Присваиваем места по абсолютным результатам
-            current_place = 1
-            for i, performance in enumerate(performances):
-                student = performance.student
-                faculty = student.group.faculty
-
-                if i > 0:
-                    prev_perf = performances[i - 1]
-                    if is_time_based:
-                        if performance.time_result != prev_perf.time_result:
-                            current_place = i + 1
-                    else:
-                        if (performance.original_result or 0) != (prev_perf.original_result or 0):
-                            current_place = i + 1
-
-                student_name = f"{student.last_name} {student.first_name[0]}."
-                if student.middle_name:
-                    student_name += f"{student.middle_name[0]}."
-
-                # Добавляем пол к имени
-                student_name_with_gender = f"{student_name} ({student.gender.value})"
-
-                results.append({
-                    "place": current_place,
-                    "faculty_id": faculty.id,
-                    "faculty_name": faculty.name,
-                    "faculty_abbreviation": faculty.abbreviation,
-                    "student_id": student.id,
-                    "student_name": student_name_with_gender,
-                    "gender": student.gender.value,
-                    "time_result": performance.time_result,
-                    "points": performance.points,
-                    "performance_id": performance.id,
-                    "sport_type_id": performance.sport_type_id,
-                    "sport_type_name": performance.sport_type.name,
-                    "is_team_sport": False,
-                    "original_result": performance.original_result
-                })
-
-    return results
+            # Общий протокол: по результату первого по id участника, как при подсчете баллов
+            firsts = [min(team, key=lambda perf: perf.id) for team in members]
+            order = [first.id for first in firsts]
+            places = rank_places([rank_key(first.result_value) for first in firsts], order=order)
 
+        results = []
+        for index in sorted(range(len(members)), key=lambda index: (places[index], order[index])):
+            team = members[index]
+            # В общем протоколе команда показывается с указанием пола
+            team_name = None if gender else f"{team[0].faculty_abbreviation} ({team[0].gender.value})"
+            results.extend(result_row(perf, places[index], team_name, True) for perf in team)
+        return results
 
-@router.get("/faculty-sport-rating/", response_model=List[dict])
-def get_faculty_sport_rating(
+    # Индивидуальные виды спорта (уже отсортированы запросом)
+    tolerance = scoring.tie_tolerance if scoring and sport_type_id else 0.0
+    places = rank_places([rank_key(perf.result_value) for perf in performances], tolerance=tolerance)
+    return [result_row(perf, place, None, False) for perf, place in zip(performances, places)]
+
+
+@router.get("/competition-results/", response_model=List[dict])
+async def get_competition_results(
+        request: Request,
         sport_type_id: Optional[int] = Query(None),
-        gender: Optional[str] = Query(None),
-        db: Session = Depends(get_db)
+        gender: Optional[Gender] = Query(None),
+        db: AsyncSession = Depends(get_read_db)
 ):
     """
-    Получить рейтинг факультетов с учетом раздельного подсчета по полу
+    Получить результаты соревнований
+    При gender=None показывает общий протокол с абсолютными результатами И баллами
+    При gender=М/Ж показывает раздельный подсчет с баллами за места
+    Ответ кэшируется до следующей записи результатов и поддерживает ETag
     """
-    if sport_type_id:
-        # Пересчитываем баллы перед формированием рейтинга
-        recalculate_competition_points(db, sport_type_id)
+    return await cached_standings_response(
+        request, ("competition-results", sport_type_id, gender), sport_type_id,
+        lambda: db.run_sync(build_competition_results, sport_type_id, gender)
+    )
+
 
-        # Рейтинг по конкретному виду спорта с учетом пола
+def build_faculty_sport_rating(db: Session, sport_type_id: Optional[int], gender: Optional[Gender]):
+    """
+    Построить рейтинг факультетов с учетом раздельного подсчета по полу.
+    Суммы поддерживаются при записи результатов (faculty_standings, faculty_competition_results,
+    faculty_total_points), здесь только чтение одной таблицы итогов.
+    """
+    # Равные суммы делят место (RANK), как overall_place общего зачета
+    if sport_type_id and gender:
+        # Вид спорта для одного пола: строки faculty_standings, включая факультеты без результатов
+        place = func.rank().over(order_by=FacultyStanding.total_points.desc()).label('place')
+        query = db.query(
+            FacultyStanding.faculty_id,
+            FacultyStanding.total_points,
+            place
+        ).filter(
+            FacultyStanding.sport_type_id == sport_type_id,
+            FacultyStanding.gender == gender
+        )
+        order = (place, FacultyStanding.faculty_id)
+    elif sport_type_id:
+        # Вид спорта для обоих полов: faculty_competition_results (место уже посчитано при записи)
+        query = db.query(
+            FacultyCompetitionResult.faculty_id,
+            FacultyCompetitionResult.total_points,
+            FacultyCompetitionResult.place
+        ).filter(
+            FacultyCompetitionResult.sport_type_id == sport_type_id
+        )
+        order = (FacultyCompetitionResult.place, FacultyCompetitionResult.faculty_id)
+    elif gender:
+        # Все виды спорта для одного пола: сумма строк faculty_standings
+        total_points = func.sum(FacultyStanding.total_points)
+        place = func.rank().over(order_by=total_points.desc()).label('place')
         query = db.query(
-            Faculty.id,
-            Faculty.name,
-            Faculty.abbreviation,
-            func.sum(StudentPerformance.points).label('total_points')
-        ).join(
-            Group, Faculty.id == Group.faculty_id
-        ).join(
-            Student, Group.id == Student.group_id
-        ).join(
-            StudentPerformance, Student.id == StudentPerformance.student_id
+            FacultyStanding.faculty_id,
+            total_points.label('total_points'),
+            place
         ).filter(
-            StudentPerformance.sport_type_id == sport_type_id
+            FacultyStanding.gender == gender
+        ).group_by(FacultyStanding.faculty_id)
+        order = (place, FacultyStanding.faculty_id)
+    else:
+        # Общий зачет
+        query = db.query(
+            FacultyTotalPoints.faculty_id,
+            FacultyTotalPoints.total_points,
+            FacultyTotalPoints.overall_place.label('place')
         )
+        order = (FacultyTotalPoints.overall_place, FacultyTotalPoints.faculty_id)
 
-        if gender:
-            query = query.filter(Student.gender == gender)
-
-        results = query.group_by(
-            Faculty.id, Faculty.name, Faculty.abbreviation
-        ).order_by(
-            desc('total_points')
-        ).all()
-
-        rating = []
-        for i, result in enumerate(results, 1):
-            rating.append({
-                "place": i,
-                "faculty_id": result.id,
-                "faculty_name": result.name,
-                "faculty_abbreviation": result.abbreviation,
-                "total_points": float(result.total_points) if result.total_points else 0,
-                "sport_type_id": sport_type_id
-            })
-
-        # Добавляем факультеты без результатов
-        faculty_ids = [r.id for r in results]
-        missing_query = db.query(Faculty).filter(~Faculty.id.in_(faculty_ids))
+    faculties = {
+        faculty.id: faculty
+        for faculty in db.query(Faculty.id, Faculty.name, Faculty.abbreviation)
+    }
 
-        if gender:
-            missing_query = missing_query.join(Group).join(Student).filter(
-                Student.gender == gender
-            ).distinct()
-
-        missing_faculties = missing_query.all()
-
-        for faculty in missing_faculties:
-            rating.append({
-                "place": len(rating) + 1,
-                "faculty_id": faculty.id,
-                "faculty_name": faculty.name,
-                "faculty_abbreviation": faculty.abbreviation,
-                "total_points": 0,
-                "sport_type_id": sport_type_id
-            })
-
-        return rating
-    else:
-        # Общий рейтинг с учетом пола
-        if gender:
-            results = db.query(
-                Faculty.id,
-                Faculty.name,
-                Faculty.abbreviation,
-                func.sum(StudentPerformance.points).label('total_points')
-            ).join(
-                Group, Faculty.id == Group.faculty_id
-            ).join(
-                Student, Group.id == Student.group_id
-            ).join(
-                StudentPerformance, Student.id == StudentPerformance.student_id
-            ).filter(
-                Student.gender == gender
-            ).group_by(
-                Faculty.id, Faculty.name, Faculty.abbreviation
-            ).order_by(
-                desc('total_points')
-            ).all()
-
-            rating = []
-            for i, result in enumerate(results, 1):
-                rating.append({
-                    "place": i,
-                    "faculty_id": result.id,
-                    "faculty_name": result.name,
-                    "faculty_abbreviation": result.abbreviation,
-                    "total_points": float(result.total_points) if result.total_points else 0,
-                    "sport_type_id": None
-                })
-
-            return rating
-        else:
-            # Пересчитываем общие результаты
-            update_faculty_results_all(db)
+    rating = []
+    for result in query.order_by(*order):
+        faculty = faculties[result.faculty_id]
+        rating.append({
+            "place": result.place,
+            "faculty_id": faculty.id,
+            "faculty_name": faculty.name,
+            "faculty_abbreviation": faculty.abbreviation,
+            "total_points": float(result.total_points or 0),
+            "sport_type_id": sport_type_id
+        })
+
+    return rating
 
-            results = db.query(FacultyTotalPoints).options(
-                joinedload(FacultyTotalPoints.faculty)
-            ).order_by(FacultyTotalPoints.overall_place).all()
 
-            rating = []
-            for result in results:
-                rating.append({
-                    "place": result.overall_place,
-                    "faculty_id": result.faculty_id,
-                    "faculty_name": result.faculty.name,
-                    "faculty_abbreviation": result.faculty.abbreviation,
-                    "total_points": result.total_points,
-                    "sport_type_id": None
-                })
+@router.get("/faculty-sport-rating/", response_model=List[dict])
+async def get_faculty_sport_rating(
+        request: Request,
+        sport_type_id: Optional[int] = Query(None),
+        gender: Optional[Gender] = Query(None),
+        db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Получить рейтинг факультетов с учетом раздельного подсчета по полу
+    Ответ кэшируется до следующей записи результатов и поддерживает ETag
+    """
+    return await cached_standings_response(
+        request, ("faculty-sport-rating", sport_type_id, gender), sport_type_id,
+        lambda: db.run_sync(build_faculty_sport_rating, sport_type_id, gender)
+    )
 
-            return rating
+
+def publish_standings_change(sport_type_id: int, event_type: str, performance_id: Optional[int], changed: dict):
+    """Сбросить кэш протоколов вида спорта и разослать изменение подписчикам"""
+    standings_cache.bump(sport_type_id)
+    live_hub.publish(sport_type_id, {
+        "type": event_type,
+        "sport_type_id": sport_type_id,
+        "performance_id": performance_id,
+        "points": changed,  # id выступления -> новые баллы
+        "version": standings_cache.version(sport_type_id)
+    })
+
+
+@router.get("/stream")
+async def stream_results(request: Request, sport_type_id: Optional[int] = Query(None)):
+    """
+    Поток изменений результатов (Server-Sent Events).
+    Без sport_type_id клиент получает изменения по всем видам спорта.
+    """
+    async def events():
+        async with live_hub.subscribe(sport_type_id) as queue:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Комментарий SSE не дает прокси закрыть простаивающее соединение
+                    yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.post("/recalculate-points/")
 def recalculate_all_points(db: Session = Depends(get_db)):
     """Пересчитать баллы для всех соревнований с раздельным подсчетом по полу"""
+    # Перечитываем правила подсчета: они могли измениться в базе
+    sport_registry.load(db)
     sport_types = db.query(SportType).all()
 
     for sport_type in sport_types:
@@ -549,6 +341,9 @@ def recalculate_all_points(db: Session = Depends(get_db)):
 
     # Обновляем общие результаты
     update_faculty_results_all(db)
+    db.commit()
+    standings_cache.bump()
+    live_hub.publish(None, {"type": "resync", "sport_type_id": None})
 
     return {"message": "Points recalculated successfully with gender separation"}
 
@@ -576,19 +371,173 @@ def create_performance(
         time_result=performance.time_result,
         original_result=performance.original_result
     )
+    scoring = lock_sport_scoring(db, performance.sport_type_id)
+    if not scoring:
+        raise HTTPException(status_code=404, detail="Вид спорта не найден")
+    try:
+        db_performance.result_value = normalize_result(
+            performance.time_result, performance.original_result, scoring
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Неверный формат времени: {performance.time_result}")
+
+    board = None
+    performer = find_performer(db, performance.student_id)
+    if performer:
+        db_performance.gender = performer.gender
+        db_performance.faculty_id = performer.faculty_id
+        if performer.faculty_id is not None:
+            board = load_ranking_board(
+                db, performance.sport_type_id, performer.gender, scoring, rank_key(db_performance.result_value)
+            )
+
     db.add(db_performance)
-    db.commit()
+    db.flush()
 
-    # Пересчитываем баллы для этого вида спорта
-    recalculate_competition_points(db, performance.sport_type_id)
+    # Пересчитываем только сдвинувшиеся места этого вида спорта и пола
+    changed = {}
+    if board is not None:
+        changed = board.insert(db_performance.id, performer.faculty_id, rank_key(db_performance.result_value))
+        db_performance.points = changed.get(db_performance.id, db_performance.points)
+        apply_points(db, {k: v for k, v in changed.items() if k != db_performance.id})
+        db.flush()
 
-    # Обновляем результаты факультетов
+    # Обновляем результаты факультетов и общий зачет
     update_faculty_results(db, performance.sport_type_id)
+    db.commit()
+    publish_standings_change(performance.sport_type_id, "performance_created", db_performance.id, changed)
 
     db.refresh(db_performance)
     return db_performance
 
 
+def parse_protocol(content: bytes, is_csv: bool) -> List[PerformanceImportRow]:
+    """Разобрать протокол в формате CSV (с заголовком) или JSON Lines"""
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Протокол должен быть в кодировке UTF-8")
+
+    if is_csv:
+        records = (
+            (line_number, {key: value or None for key, value in record.items()})
+            for line_number, record in enumerate(csv.DictReader(io.StringIO(text)), 2)
+        )
+    else:
+        records = (
+            (line_number, line)
+            for line_number, line in enumerate(text.splitlines(), 1)
+            if line.strip()
+        )
+
+    rows = []
+    for line_number, record in records:
+        try:
+            if is_csv:
+                rows.append(PerformanceImportRow.model_validate(record))
+            else:
+                rows.append(PerformanceImportRow.model_validate_json(record))
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=f"Строка {line_number}: {e.errors()[0]['msg']}")
+    return rows
+
+
+@router.post("/performances/import/", response_model=PerformanceImportResult)
+def import_performances(
+        competition_id: int = Query(...),
+        judge_id: Optional[int] = Query(None),
+        file: UploadFile = File(...),
+        db: Session = Depends(get_db)
+):
+    """
+    Загрузить протокол соревнования целиком (CSV или JSON Lines).
+    Поля строки: full_name, faculty_abbreviation, gender, time_result, original_result, judge_id.
+    Студенты находятся или создаются пакетом, выступления вставляются одним
+    многострочным INSERT, баллы вида спорта пересчитываются один раз.
+    """
+    competition = db.query(Competition).filter(Competition.id == competition_id).first()
+    if not competition:
+        raise HTTPException(status_code=404, detail="Соревнование не найдено")
+
+    is_csv = (file.filename or "").lower().endswith(".csv") or file.content_type == "text/csv"
+    rows = parse_protocol(file.file.read(), is_csv)
+    if any(row.judge_id is None for row in rows) and judge_id is None:
+        raise HTTPException(status_code=400, detail="Не указан судья")
+
+    # Судьи всех записей проверяются одним запросом до создания студентов
+    judge_lines = {}
+    for line_number, row in enumerate(rows, 1):
+        judge_lines.setdefault(row.judge_id or judge_id, []).append(line_number)
+    known_judges = {
+        known_id for (known_id,) in db.query(Judge.id).filter(Judge.id.in_(judge_lines))
+    }
+    unknown_judges = sorted(judge_lines.keys() - known_judges)
+    if unknown_judges:
+        raise HTTPException(status_code=404, detail="; ".join(
+            f"Судья {unknown_id} не найден (записи {', '.join(map(str, judge_lines[unknown_id]))})"
+            for unknown_id in unknown_judges
+        ))
+
+    students = find_or_create_students(db, [
+        StudentFindOrCreateRequest(
+            faculty_abbreviation=row.faculty_abbreviation,
+            full_name=row.full_name,
+            gender=row.gender
+        )
+        for row in rows
+    ])
+
+    # Выступления, которые уже есть в этом соревновании, пропускаем
+    seen = {
+        student_id for (student_id,) in db.query(StudentPerformance.student_id).filter(
+            StudentPerformance.competition_id == competition_id,
+            StudentPerformance.student_id.in_({student.student_id for student in students})
+        )
+    }
+
+    scoring = sport_registry.get(db, competition.sport_type_id)
+    if not scoring:
+        raise HTTPException(status_code=400, detail="У соревнования не указан вид спорта")
+    new_performances = []
+    for line_number, (row, student) in enumerate(zip(rows, students), 1):
+        if student.student_id in seen:
+            continue
+        seen.add(student.student_id)
+        try:
+            result_value = normalize_result(row.time_result, row.original_result, scoring)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Запись {line_number}: неверный формат времени")
+        new_performances.append({
+            "student_id": student.student_id,
+            "sport_type_id": competition.sport_type_id,
+            "competition_id": competition_id,
+            "judge_id": row.judge_id or judge_id,
+            "points": 0,  # Будет пересчитано
+            "time_result": row.time_result,
+            "original_result": row.original_result,
+            "result_value": result_value,
+            "faculty_id": student.faculty_id,
+            "gender": Gender(row.gender)
+        })
+
+    if new_performances:
+        db.execute(insert(StudentPerformance), new_performances)
+
+    # Один пересчет вида спорта на весь протокол
+    changed = recalculate_competition_points(db, competition.sport_type_id)
+    update_faculty_results(db, competition.sport_type_id)
+    db.commit()
+    publish_standings_change(competition.sport_type_id, "performances_imported", None, changed)
+
+    return PerformanceImportResult(
+        competition_id=competition_id,
+        sport_type_id=competition.sport_type_id,
+        imported=len(new_performances),
+        skipped=len(rows) - len(new_performances),
+        students_created=len({student.student_id for student in students if student.created})
+    )
+
+
 @router.delete("/performances/{performance_id}")
 def delete_performance(
         performance_id: int,
@@ -599,110 +548,202 @@ def delete_performance(
         raise HTTPException(status_code=404, detail="Performance not found")
 
     sport_type_id = db_performance.sport_type_id
+    # Таблица, в которой выступление было ранжировано: по сохраненным в нем полу и факультету
+    board = None
+    scoring = lock_sport_scoring(db, sport_type_id)
+    if scoring and db_performance.faculty_id is not None:
+        board = load_ranking_board(db, sport_type_id, db_performance.gender, scoring)
+
     db.delete(db_performance)
-    db.commit()
+    db.flush()
 
-    # Пересчитываем баллы для оставшихся участников
-    recalculate_competition_points(db, sport_type_id)
+    # Пересчитываем баллы только для сдвинувшихся участников
+    changed = {}
+    if board is not None:
+        changed = board.remove(performance_id)
+        apply_points(db, changed)
 
-    # Обновляем результаты факультетов
+    # Обновляем результаты факультетов и общий зачет
     update_faculty_results(db, sport_type_id)
+    db.commit()
+    publish_standings_change(sport_type_id, "performance_deleted", performance_id, changed)
 
     return {"message": "Performance deleted successfully"}
 
 
-def update_faculty_results(db: Session, sport_type_id: int):
-    """Update faculty results for a specific sport type"""
-    faculties = db.query(Faculty).all()
-
-    for faculty in faculties:
-        total_points = db.query(func.sum(StudentPerformance.points)).join(
-            Student
-        ).join(
-            Group
-        ).filter(
-            Group.faculty_id == faculty.id,
-            StudentPerformance.sport_type_id == sport_type_id
-        ).scalar() or 0
+def upsert_from_select(db: Session, table, columns, select_stmt, index_elements):
+    """
+    INSERT ... SELECT ... ON CONFLICT DO UPDATE для PostgreSQL и SQLite
+    (в тестах): при конфликте по index_elements перезаписываются остальные столбцы.
+    """
+    dialect_insert = sqlite_insert if db.get_bind().dialect.name == "sqlite" else pg_insert
+    # SQLite без WHERE принял бы ON CONFLICT за условие соединения в SELECT
+    upsert = dialect_insert(table).from_select(columns, select_stmt.where(true()))
+    db.execute(upsert.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={name: upsert.excluded[name] for name in columns if name not in index_elements}
+    ))
 
-        faculty_result = db.query(FacultyCompetitionResult).filter(
-            FacultyCompetitionResult.faculty_id == faculty.id,
-            FacultyCompetitionResult.sport_type_id == sport_type_id
-        ).first()
 
-        if not faculty_result:
-            faculty_result = FacultyCompetitionResult(
-                faculty_id=faculty.id,
-                sport_type_id=sport_type_id,
-                total_points=total_points
-            )
-            db.add(faculty_result)
-        else:
-            faculty_result.total_points = total_points
+def upsert_faculty_standings(db: Session, sport_type_id: Optional[int] = None):
+    """
+    Пересобрать суммы баллов факультетов по видам спорта и полу одним INSERT ... ON CONFLICT.
+    Строка с нулем есть у каждого факультета для каждого пола: пары факультет x пол
+    берутся из справочника, а не из студентов, поэтому запись не читает таблицу
+    студентов и перезаписывает все строки вида спорта. Без sport_type_id - по всем видам спорта.
+    """
+    performance_sums = db.query(
+        StudentPerformance.faculty_id.label('faculty_id'),
+        StudentPerformance.sport_type_id.label('sport_type_id'),
+        StudentPerformance.gender.label('gender'),
+        func.sum(StudentPerformance.points).label('total_points')
+    ).filter(StudentPerformance.faculty_id.isnot(None))
+    if sport_type_id is not None:
+        performance_sums = performance_sums.filter(StudentPerformance.sport_type_id == sport_type_id)
+    performance_sums = performance_sums.group_by(
+        StudentPerformance.faculty_id, StudentPerformance.sport_type_id, StudentPerformance.gender
+    ).subquery()
+
+    genders = union_all(*(select(literal(gender.name).label('gender')) for gender in Gender)).subquery('genders')
+    faculty_genders = select(
+        Faculty.id.label('faculty_id'),
+        cast(genders.c.gender, FacultyStanding.gender.type).label('gender')
+    ).join(genders, true()).subquery()
+
+    totals = select(
+        faculty_genders.c.faculty_id,
+        SportType.id,
+        faculty_genders.c.gender,
+        func.coalesce(performance_sums.c.total_points, 0)
+    ).select_from(faculty_genders).join(
+        SportType, true()
+    ).outerjoin(
+        performance_sums, and_(
+            performance_sums.c.faculty_id == faculty_genders.c.faculty_id,
+            performance_sums.c.sport_type_id == SportType.id,
+            performance_sums.c.gender == faculty_genders.c.gender
+        )
+    )
+    if sport_type_id is not None:
+        totals = totals.where(SportType.id == sport_type_id)
 
-    db.commit()
+    upsert_from_select(
+        db, FacultyStanding.__table__, ['faculty_id', 'sport_type_id', 'gender', 'total_points'], totals,
+        index_elements=['faculty_id', 'sport_type_id', 'gender']
+    )
 
-    # Обновление мест
-    faculty_results = db.query(FacultyCompetitionResult).filter(
-        FacultyCompetitionResult.sport_type_id == sport_type_id
-    ).order_by(FacultyCompetitionResult.total_points.desc()).all()
 
-    for i, result in enumerate(faculty_results, 1):
-        result.place = i
+def upsert_faculty_competition_results(db: Session, sport_type_id: Optional[int] = None):
+    """
+    Пересобрать суммы баллов факультетов по видам спорта из faculty_standings
+    одним INSERT ... ON CONFLICT и проставить места одним UPDATE с RANK().
+    Без sport_type_id - по всем видам спорта.
+    """
+    standings_table = FacultyStanding.__table__
+    standing_sums = select(
+        standings_table.c.faculty_id,
+        standings_table.c.sport_type_id,
+        func.sum(standings_table.c.total_points).label('total_points')
+    )
+    if sport_type_id is not None:
+        standing_sums = standing_sums.where(standings_table.c.sport_type_id == sport_type_id)
+    standing_sums = standing_sums.group_by(
+        standings_table.c.faculty_id, standings_table.c.sport_type_id
+    ).subquery()
+
+    # Каждому факультету строка по каждому виду спорта, в том числе без результатов
+    totals = select(
+        Faculty.id,
+        SportType.id,
+        func.coalesce(standing_sums.c.total_points, 0)
+    ).select_from(Faculty).join(
+        SportType, true()
+    ).outerjoin(
+        standing_sums, and_(
+            standing_sums.c.faculty_id == Faculty.id,
+            standing_sums.c.sport_type_id == SportType.id
+        )
+    )
+    if sport_type_id is not None:
+        totals = totals.where(SportType.id == sport_type_id)
 
-    db.commit()
+    results_table = FacultyCompetitionResult.__table__
+    upsert_from_select(
+        db, results_table, ['faculty_id', 'sport_type_id', 'total_points'], totals,
+        index_elements=['faculty_id', 'sport_type_id']
+    )
 
+    ranked = select(
+        results_table.c.id,
+        func.rank().over(
+            partition_by=results_table.c.sport_type_id,
+            order_by=results_table.c.total_points.desc()
+        ).label('place')
+    )
+    if sport_type_id is not None:
+        ranked = ranked.where(results_table.c.sport_type_id == sport_type_id)
+    ranked = ranked.subquery()
+
+    db.execute(
+        update(results_table).where(
+            results_table.c.id == ranked.c.id
+        ).values(place=ranked.c.place)
+    )
 
-def update_faculty_results_all(db: Session):
-    """Update results for all sport types"""
-    sport_types = db.query(SportType).all()
 
-    for sport_type in sport_types:
-        update_faculty_results(db, sport_type.id)
+def upsert_faculty_total_points(db: Session):
+    """Пересобрать общий зачет факультетов одним INSERT ... ON CONFLICT и одним UPDATE с RANK()"""
+    results_table = FacultyCompetitionResult.__table__
+    sport_sums = select(
+        results_table.c.faculty_id,
+        func.sum(results_table.c.total_points).label('total_points')
+    ).group_by(results_table.c.faculty_id).subquery()
 
-    update_total_points(db)
+    totals = select(
+        Faculty.id,
+        func.coalesce(sport_sums.c.total_points, 0)
+    ).select_from(Faculty).outerjoin(
+        sport_sums, sport_sums.c.faculty_id == Faculty.id
+    )
 
+    totals_table = FacultyTotalPoints.__table__
+    upsert_from_select(db, totals_table, ['faculty_id', 'total_points'], totals, index_elements=['faculty_id'])
 
-def update_total_points(db: Session):
-    """Update total points for all faculties across all sports"""
-    faculties = db.query(Faculty).all()
-
-    for faculty in faculties:
-        total_points = db.query(func.sum(FacultyCompetitionResult.total_points)).filter(
-            FacultyCompetitionResult.faculty_id == faculty.id
-        ).scalar() or 0
-
-        faculty_total = db.query(FacultyTotalPoints).filter(
-            FacultyTotalPoints.faculty_id == faculty.id
-        ).first()
-
-        if not faculty_total:
-            faculty_total = FacultyTotalPoints(
-                faculty_id=faculty.id,
-                total_points=total_points
-            )
-            db.add(faculty_total)
-        else:
-            faculty_total.total_points = total_points
+    ranked = select(
+        totals_table.c.id,
+        func.rank().over(order_by=totals_table.c.total_points.desc()).label('overall_place')
+    ).subquery()
 
-    db.commit()
+    db.execute(
+        update(totals_table).where(
+            totals_table.c.id == ranked.c.id
+        ).values(overall_place=ranked.c.overall_place)
+    )
 
-    faculty_totals = db.query(FacultyTotalPoints).order_by(
-        FacultyTotalPoints.total_points.desc()
-    ).all()
 
-    for i, total in enumerate(faculty_totals, 1):
-        total.overall_place = i
+def update_faculty_results(db: Session, sport_type_id: int):
+    """Update faculty results for a specific sport type and the overall totals (the caller commits)"""
+    upsert_faculty_standings(db, sport_type_id)
+    upsert_faculty_competition_results(db, sport_type_id)
+    upsert_faculty_total_points(db)
 
-    db.commit()
 
+@timed("update_faculty_results_all")
+def update_faculty_results_all(db: Session):
+    """Update results for all sport types (the caller commits)"""
+    upsert_faculty_standings(db)
+    upsert_faculty_competition_results(db)
+    upsert_faculty_total_points(db)
+
+
+def update_total_points(db: Session):
+    """Update total points for all faculties across all sports (the caller commits)"""
+    upsert_faculty_total_points(db)
 
-@router.get("/spartakiada-rating/", response_model=List[FacultyTotalPointsRead])
-def get_spartakiada_rating(db: Session = Depends(get_db)):
-    """Получить общий рейтинг спартакиады"""
-    # Пересчитываем все результаты
-    update_faculty_results_all(db)
 
+def build_spartakiada_rating(db: Session):
+    """Построить общий рейтинг спартакиады"""
+    # Общий зачет поддерживается при записи результатов, здесь только чтение
     results = db.query(FacultyTotalPoints).options(
         joinedload(FacultyTotalPoints.faculty)
     ).order_by(FacultyTotalPoints.overall_place).all()
@@ -718,4 +759,13 @@ def get_spartakiada_rating(db: Session = Depends(get_db)):
             overall_place=result.overall_place
         ))
 
-    return response
\ No newline at end of file
+    return response
+
+
+@router.get("/spartakiada-rating/", response_model=List[FacultyTotalPointsRead])
+async def get_spartakiada_rating(request: Request, db: AsyncSession = Depends(get_read_db)):
+    """Получить общий рейтинг спартакиады (кэшируется, поддерживает ETag)"""
+    return await cached_standings_response(
+        request, ("spartakiada-rating",), None,
+        lambda: db.run_sync(build_spartakiada_rating)
+    )
@@ -1,129 +1,143 @@
 # backend/app/api/students.py - ИСПРАВЛЕННАЯ ВЕРСИЯ
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 from typing import Dict, List, Optional
 
-from ..database import get_db
-from ..models import Student, Faculty, Group, Competition, Judge, User, Team, team_students, SportType
+from ..database import get_async_db, get_db
+from ..models import Student, Faculty, Group, Competition, Judge, User, Team, team_students, SportType, StudentPerformance
+from ..models.student import Gender
 from ..schemas.student import StudentCreate, StudentRead, StudentFindOrCreateRequest, StudentFindOrCreateResponse, StudentTeamCreate
 from ..schemas.sport import TeamCreate
+from ..utils.pagination import PageParams, paginated_response
+from ..utils.ranking import sync_performers
+from ..utils.student_search import SEARCH_LIMIT, search_students
 
 router = APIRouter()
 
+# Максимальный размер пакета для /find-or-create/batch/
+FIND_OR_CREATE_BATCH_LIMIT = 1000
+
 
 @router.get("/", response_model=List[StudentRead])
-def get_students(
+async def get_students(
         faculty_abbreviation: Optional[str] = Query(None),
         first_name: Optional[str] = Query(None),
         last_name: Optional[str] = Query(None),
         gender: Optional[str] = Query(None),
-        db: Session = Depends(get_db)
+        search: Optional[str] = Query(None, description="Поиск по началу или части ФИО, результаты ранжированы"),
+        page: PageParams = Depends(),
+        db: AsyncSession = Depends(get_async_db)
 ):
-    """Поиск студентов по различным критериям"""
-    query = db.query(Student).join(Group).join(Faculty)
+    """
+    Поиск студентов по различным критериям.
+    С search возвращаются не более limit (по умолчанию 20) лучших совпадений без курсора.
+    """
+    query = select(Student).join(Group).join(Faculty)
 
     if faculty_abbreviation:
-        query = query.filter(Faculty.abbreviation == faculty_abbreviation)
+        query = query.where(Faculty.abbreviation == faculty_abbreviation)
 
     if first_name:
-        query = query.filter(Student.first_name.ilike(f"%{first_name}%"))
+        query = query.where(Student.first_name.ilike(f"%{first_name}%"))
 
     if last_name:
-        query = query.filter(Student.last_name.ilike(f"%{last_name}%"))
+        query = query.where(Student.last_name.ilike(f"%{last_name}%"))
 
     if gender:
-        query = query.filter(Student.gender == gender)
+        query = query.where(Student.gender == gender)
+
+    if search:
+        return await search_students(db, query, search, page.limit or SEARCH_LIMIT)
+
+    return await paginated_response(
+        db, query, (Student.last_name, Student.id),
+        lambda student: StudentRead.model_validate(student).model_dump(mode="json"),
+        page, scalars=True
+    )
+
+
+def student_row_to_dict(row):
+    item = dict(row._mapping)
+    item['gender'] = row.gender.value
+    return item
 
-    students = query.all()
-    return students
 
 @router.get("/student_by_faculty", response_model=List[Dict])
-def get_students_by_faculty_id(
+async def get_students_by_faculty_id(
         faculty_id: Optional[int] = Query(None),
         gender: Optional[str] = Query(None),
-        db: Session = Depends(get_db)
+        page: PageParams = Depends(),
+        db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(Student).join(Group).join(Faculty)
+    """Студенты факультета одним запросом (плоская проекция без ORM-объектов)"""
+    query = select(
+        Student.id,
+        Student.first_name,
+        Student.last_name,
+        Student.middle_name,
+        Student.gender,
+        Student.group_id,
+        Group.number.label('group_name'),
+        Faculty.abbreviation.label('faculty_name')
+    ).join(
+        Group, Student.group_id == Group.id
+    ).join(
+        Faculty, Group.faculty_id == Faculty.id
+    )
 
     if faculty_id:
-        query = query.filter(Faculty.id == faculty_id)
+        query = query.where(Faculty.id == faculty_id)
 
     if gender:
-        query = query.filter(Student.gender == gender)
-
-    students = query.all()
+        query = query.where(Student.gender == gender)
 
-    result = []
-    for student in students:
-        query = db.query(Group).filter(Group.id == student.group_id)
-        group = query.first()
+    return await paginated_response(db, query, (Student.id,), student_row_to_dict, page)
 
-        query = db.query(Faculty).filter(Faculty.id == faculty_id)
-        faculty = query.first()
-
-        result.append({
-            'id': student.id,
-            'first_name': student.first_name,
-            'last_name': student.last_name,
-            'middle_name': student.middle_name,
-            'gender': student.gender,
-            'group_id': student.group_id,
-            'group_name': group.number,
-            'faculty_name': faculty.abbreviation,
-        })
-
-    return result
 
 @router.get("/team_by_sport_faculty", response_model=List[Dict])
-def get_team_by_sport_faculty(
-    db: Session = Depends(get_db), 
-    faculty_id: Optional[int] = Query(None), 
+async def get_team_by_sport_faculty(
+    faculty_id: Optional[int] = Query(None),
     sport_type_id: Optional[int] = Query(None),
     gender: Optional[str] = Query(None),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    
-    query = db.query(Student
-        ).join(team_students, Student.id == team_students.c.student_id
-        ).join(Team, team_students.c.team_id == Team.id
-        ).options(
-            joinedload(Student.group),
-            joinedload(Student.teams).joinedload(Team.sport_type),
-            joinedload(Student.teams).joinedload(Team.faculty)
-        )
+    """Состав команды факультета по виду спорта"""
+    query = select(
+        Student.id,
+        Student.first_name,
+        Student.last_name,
+        Student.middle_name,
+        Student.gender,
+        Group.number.label('group_number'),
+        SportType.name.label('sport_type_name'),
+        Faculty.name.label('faculty_name'),
+        Team.id.label('team_id')
+    ).join(
+        team_students, Student.id == team_students.c.student_id
+    ).join(
+        Team, team_students.c.team_id == Team.id
+    ).join(
+        Group, Student.group_id == Group.id
+    ).join(
+        SportType, Team.sport_type_id == SportType.id
+    ).join(
+        Faculty, Team.faculty_id == Faculty.id
+    )
 
     if sport_type_id:
-        query = query.filter(Team.sport_type_id == sport_type_id)
-    
+        query = query.where(Team.sport_type_id == sport_type_id)
+
     if faculty_id:
-        query = query.filter(Team.faculty_id == faculty_id)
-    
+        query = query.where(Team.faculty_id == faculty_id)
+
     if gender:
-        query = query.filter(Student.gender == gender)
-    
-    students = query.all()
-    
-    result = []
-    for student in students:
-        team = None
-        for t in student.teams:
-            if t.faculty_id == faculty_id and t.sport_type_id == sport_type_id:
-                team = t
-                break
-        
-        if team:
-            result.append({
-                'id': student.id,
-                'first_name': student.first_name,
-                'last_name': student.last_name,
-                'middle_name': student.middle_name,
-                'gender': student.gender,
-                'group_number': student.group.number,
-                'sport_type_name': team.sport_type.name,
-                'faculty_name': team.faculty.name,
-                'team_id': team.id,
-            })
-    
-    return result
+        query = query.where(Student.gender == gender)
+
+    # Ключ курсора читается из строки по имени: id команды выбран под меткой team_id
+    return await paginated_response(db, query, (Student.id, Team.id.label('team_id')), student_row_to_dict, page)
 
 @router.post('/new_student_team')
 def create_new_student_team(
@@ -288,26 +302,140 @@ def find_or_create_student(
     )
 
 
+@router.post("/find-or-create/batch/", response_model=List[StudentFindOrCreateResponse])
+def find_or_create_students_batch(
+        requests: List[StudentFindOrCreateRequest],
+        db: Session = Depends(get_db)
+):
+    """Найти или создать студентов пакетом; ответы идут в порядке запросов"""
+    if len(requests) > FIND_OR_CREATE_BATCH_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"В пакете не более {FIND_OR_CREATE_BATCH_LIMIT} студентов"
+        )
+
+    responses = find_or_create_students(db, requests)
+    db.commit()
+    return responses
+
+
+def parse_full_name(full_name: str):
+    """Разобрать "Фамилия Имя [Отчество]" на части"""
+    name_parts = full_name.strip().split()
+    if len(name_parts) < 2:
+        raise HTTPException(status_code=400, detail="Имя должно содержать минимум фамилию и имя")
+    return name_parts[0], name_parts[1], name_parts[2] if len(name_parts) > 2 else None
+
+
+def find_or_create_students(
+        db: Session,
+        requests: List[StudentFindOrCreateRequest]
+) -> List[StudentFindOrCreateResponse]:
+    """
+    Пакетный вариант find_or_create_student: найти или создать всех студентов
+    фиксированным числом запросов независимо от размера пакета.
+    Новые студенты только добавляются в сессию (flush), фиксирует вызывающий.
+    """
+    parsed = []
+    for request in requests:
+        last_name, first_name, middle_name = parse_full_name(request.full_name)
+        try:
+            gender = Gender(request.gender)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Неизвестный пол: {request.gender}")
+        parsed.append((request.faculty_abbreviation, last_name, first_name, middle_name, gender))
+
+    # Факультеты
+    abbreviations = {item[0] for item in parsed}
+    faculties = {
+        faculty.abbreviation: faculty
+        for faculty in db.query(Faculty).filter(Faculty.abbreviation.in_(abbreviations))
+    }
+    for abbreviation in abbreviations:
+        if abbreviation not in faculties:
+            raise HTTPException(status_code=404, detail=f"Факультет {abbreviation} не найден")
+
+    # Индекс существующих студентов (факультет, фамилия, имя, пол) -> студент,
+    # заполняется одним запросом по индексу ix_students_identity
+    faculty_ids = {faculty.id for faculty in faculties.values()}
+    names = {(item[1], item[2]) for item in parsed}
+    identity_index = {}
+    existing = db.query(Student, Group.faculty_id).join(
+        Group, Student.group_id == Group.id
+    ).filter(
+        tuple_(Student.last_name, Student.first_name).in_(names),
+        Group.faculty_id.in_(faculty_ids)
+    ).order_by(Student.id)
+    for student, faculty_id in existing:
+        identity_index.setdefault((faculty_id, student.last_name, student.first_name, student.gender), student)
+
+    # Первая группа каждого факультета для новых студентов
+    first_groups = dict(
+        db.query(Group.faculty_id, func.min(Group.id)).filter(
+            Group.faculty_id.in_(faculty_ids)
+        ).group_by(Group.faculty_id).all()
+    )
+
+    created_ids = set()
+    items = []
+    for abbreviation, last_name, first_name, middle_name, gender in parsed:
+        faculty = faculties[abbreviation]
+        key = (faculty.id, last_name, first_name, gender)
+        student = identity_index.get(key)
+        if student is None:
+            group_id = first_groups.get(faculty.id)
+            if group_id is None:
+                raise HTTPException(status_code=404, detail=f"Группы факультета {abbreviation} не найдены")
+            student = Student(
+                first_name=first_name,
+                last_name=last_name,
+                middle_name=middle_name,
+                gender=gender,
+                group_id=group_id
+            )
+            db.add(student)
+            identity_index[key] = student
+            created_ids.add(id(student))
+        items.append((student, faculty))
+
+    db.flush()
+
+    return [
+        StudentFindOrCreateResponse(
+            student_id=student.id,
+            student_name=f"{student.last_name} {student.first_name}",
+            faculty_id=faculty.id,
+            faculty_name=faculty.name,
+            created=id(student) in created_ids
+        )
+        for student, faculty in items
+    ]
+
+
 @router.get("/judges/", response_model=List[dict])
-def get_judges(sport_type_id: Optional[int] = Query(None), db: Session = Depends(get_db)):
+async def get_judges(
+        sport_type_id: Optional[int] = Query(None),
+        page: PageParams = Depends(),
+        db: AsyncSession = Depends(get_async_db)
+):
     """Получить список судей"""
-    query = db.query(Judge).join(User)
+    query = select(
+        Judge.id,
+        Judge.user_id,
+        User.last_name,
+        User.first_name,
+        Judge.sport_type_id
+    ).join(User, Judge.user_id == User.id)
 
     if sport_type_id:
-        query = query.filter(Judge.sport_type_id == sport_type_id)
-
-    judges = query.all()
-
-    result = []
-    for judge in judges:
-        result.append({
-            "id": judge.id,
-            "user_id": judge.user_id,
-            "name": f"{judge.user.last_name} {judge.user.first_name}",
-            "sport_type_id": judge.sport_type_id
-        })
+        query = query.where(Judge.sport_type_id == sport_type_id)
 
-    return result
+    return await paginated_response(db, query, (Judge.id,), lambda judge: {
+        "id": judge.id,
+        "user_id": judge.user_id,
+        "name": f"{judge.last_name} {judge.first_name}",
+        "sport_type_id": judge.sport_type_id
+    }, page)
 
 
 @router.post("/", response_model=StudentRead)
@@ -327,9 +455,9 @@ def create_student(student: StudentCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/{student_id}", response_model=StudentRead)
-def get_student(student_id: int, db: Session = Depends(get_db)):
+async def get_student(student_id: int, db: AsyncSession = Depends(get_async_db)):
     """Получить студента по ID"""
-    student = db.query(Student).filter(Student.id == student_id).first()
+    student = await db.get(Student, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Студент не найден")
     return student
@@ -347,8 +475,30 @@ def update_student(student_id: int, student: StudentCreate, db: Session = Depend
     db_student.middle_name = student.middle_name
     db_student.gender = student.gender
     db_student.group_id = student.group_id
-
+    db.flush()
+
+    # Выступления хранят факультет и пол студента: при их смене обновляем и пересчитываем виды спорта
+    performers_changed = sync_performers(db, student_id=student_id)
+
+    # results импортирует этот модуль, поэтому импорт здесь
+    from .results import recalculate_competition_points, update_faculty_results, publish_standings_change
+
+    # Изменение студента и пересчет его видов спорта - одна транзакция
+    changes = {}
+    if performers_changed:
+        sport_type_ids = [
+            sport_type_id for (sport_type_id,) in db.query(StudentPerformance.sport_type_id).filter(
+                StudentPerformance.student_id == student_id
+            ).distinct()
+        ]
+        for sport_type_id in sport_type_ids:
+            changes[sport_type_id] = recalculate_competition_points(db, sport_type_id)
+            update_faculty_results(db, sport_type_id)
     db.commit()
+
+    for sport_type_id, changed in changes.items():
+        publish_standings_change(sport_type_id, "student_updated", None, changed)
+
     db.refresh(db_student)
     return db_student
 
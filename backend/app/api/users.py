@@ -1,23 +1,30 @@
 # backend/app/api/users.py - ПОЛНАЯ ВЕРСИЯ
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from ..database import get_db
+from ..database import get_async_db, get_db
 from ..models import User, Judge, Teacher, Faculty, Group, SportType
 from ..schemas import UserCreate, UserRead
-from ..api.auth import get_current_user, get_password_hash
+from ..api.auth import get_current_user, get_login_credentials, hash_password_async
+from ..utils.principal_cache import Principal
+from ..utils.pagination import PageParams, paginated_response
 
 router = APIRouter()
 
+# Размер страницы списка пользователей по умолчанию
+DEFAULT_PAGE_SIZE = 100
+
 
 @router.get("/", response_model=List[UserRead])
-def get_users(
-        skip: int = 0,
-        limit: int = 100,
+async def get_users(
         role: Optional[str] = None,
-        db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        page: PageParams = Depends(),
+        db: AsyncSession = Depends(get_async_db),
+        current_user: Principal = Depends(get_current_user)
 ):
     """Получить список пользователей (только для админов)"""
     if current_user.role.value != "admin":
@@ -26,16 +33,19 @@ def get_users(
             detail="Недостаточно прав доступа"
         )
 
-    query = db.query(User)
+    query = select(User)
     if role:
-        query = query.filter(User.role == role)
+        query = query.where(User.role == role)
 
-    users = query.offset(skip).limit(limit).all()
-    return users
+    return await paginated_response(
+        db, query, (User.id,),
+        lambda user: UserRead.model_validate(user).model_dump(mode="json"),
+        page, scalars=True, default_limit=DEFAULT_PAGE_SIZE
+    )
 
 
 @router.get("/me", response_model=UserRead)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(current_user: Principal = Depends(get_current_user)):
     """Получить информацию о текущем пользователе"""
     return current_user
 
@@ -44,7 +54,7 @@ def get_current_user_info(current_user: User = Depends(get_current_user)):
 def get_user(
         user_id: int,
         db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        current_user: Principal = Depends(get_current_user)
 ):
     """Получить пользователя по ID"""
     # Пользователи могут видеть только свою информацию, админы - всех
@@ -61,10 +71,10 @@ def get_user(
 
 
 @router.post("/", response_model=UserRead)
-def create_user(
+async def create_user(
         user: UserCreate,
         db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        current_user: Principal = Depends(get_current_user)
 ):
     """Создать нового пользователя (только для админов)"""
     if current_user.role.value != "admin":
@@ -74,40 +84,26 @@ def create_user(
         )
 
     # Проверяем, что пользователь с таким username не существует
-    db_user = db.query(User).filter(User.username == user.username).first()
-    if db_user:
+    if await run_in_threadpool(get_login_credentials, db, user.username):
         raise HTTPException(status_code=400, detail="Пользователь с таким логином уже существует")
 
-    # Создаем пользователя
+    # Создаем пользователя; bcrypt - в пуле хэширования, а не в пуле потоков запросов
     db_user = User(
         first_name=user.first_name,
         last_name=user.last_name,
         middle_name=user.middle_name,
         username=user.username,
-        hashed_password=get_password_hash(user.password),
+        hashed_password=await hash_password_async(user.password),
         role=user.role
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await run_in_threadpool(db.commit)
+    await run_in_threadpool(db.refresh, db_user)
     return db_user
 
 
-@router.put("/{user_id}", response_model=UserRead)
-def update_user(
-        user_id: int,
-        user: UserCreate,
-        db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
-):
-    """Обновить пользователя"""
-    # Пользователи могут обновлять только свою информацию, админы - всех
-    if current_user.role.value != "admin" and current_user.id != user_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Недостаточно прав доступа"
-        )
-
+def save_user(db: Session, user_id: int, user: UserCreate, hashed_password: Optional[str], change_role: bool):
+    """Записать изменения пользователя (синхронная часть update_user)"""
     db_user = db.query(User).filter(User.id == user_id).first()
     if not db_user:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
@@ -119,11 +115,11 @@ def update_user(
     db_user.username = user.username
 
     # Обновляем пароль только если он предоставлен
-    if user.password:
-        db_user.hashed_password = get_password_hash(user.password)
+    if hashed_password:
+        db_user.hashed_password = hashed_password
 
     # Только админы могут менять роли
-    if current_user.role.value == "admin":
+    if change_role:
         db_user.role = user.role
 
     db.commit()
@@ -131,11 +127,33 @@ def update_user(
     return db_user
 
 
+@router.put("/{user_id}", response_model=UserRead)
+async def update_user(
+        user_id: int,
+        user: UserCreate,
+        db: Session = Depends(get_db),
+        current_user: Principal = Depends(get_current_user)
+):
+    """Обновить пользователя"""
+    # Пользователи могут обновлять только свою информацию, админы - всех
+    if current_user.role.value != "admin" and current_user.id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Недостаточно прав доступа"
+        )
+
+    # Хэш считается до чтения пользователя: соединение не ждет очереди пула bcrypt
+    hashed_password = await hash_password_async(user.password) if user.password else None
+    return await run_in_threadpool(
+        save_user, db, user_id, user, hashed_password, current_user.role.value == "admin"
+    )
+
+
 @router.delete("/{user_id}")
 def delete_user(
         user_id: int,
         db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        current_user: Principal = Depends(get_current_user)
 ):
     """Удалить пользователя (только для админов)"""
     if current_user.role.value != "admin":
@@ -162,7 +180,7 @@ def assign_user_as_judge(
         user_id: int,
         sport_type_id: int,
         db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        current_user: Principal = Depends(get_current_user)
 ):
     """Назначить пользователя судьей по виду спорта"""
     if current_user.role.value != "admin":
@@ -204,7 +222,7 @@ def assign_user_as_teacher(
         faculty_id: int,
         group_id: Optional[int] = None,
         db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        current_user: Principal = Depends(get_current_user)
 ):
     """Назначить пользователя преподавателем"""
     if current_user.role.value != "admin":
@@ -269,20 +287,29 @@ def get_judges(db: Session = Depends(get_db)):
 
 
 @router.get("/teachers/", response_model=List[dict])
-def get_teachers(db: Session = Depends(get_db)):
+async def get_teachers(page: PageParams = Depends(), db: AsyncSession = Depends(get_async_db)):
     """Получить список всех преподавателей"""
-    teachers = db.query(Teacher).join(User).join(Faculty).all()
-
-    result = []
-    for teacher in teachers:
-        result.append({
-            "id": teacher.id,
-            "user_id": teacher.user_id,
-            "username": teacher.user.username,
-            "name": f"{teacher.user.last_name} {teacher.user.first_name}",
-            "faculty_id": teacher.faculty_id,
-            "faculty_name": teacher.faculty.name,
-            "group_id": teacher.group_id
-        })
+    query = select(
+        Teacher.id,
+        Teacher.user_id,
+        User.username,
+        User.last_name,
+        User.first_name,
+        Teacher.faculty_id,
+        Faculty.name.label('faculty_name'),
+        Teacher.group_id
+    ).join(
+        User, Teacher.user_id == User.id
+    ).join(
+        Faculty, Teacher.faculty_id == Faculty.id
+    )
 
-    return result
\ No newline at end of file
+    return await paginated_response(db, query, (Teacher.id,), lambda teacher: {
+        "id": teacher.id,
+        "user_id": teacher.user_id,
+        "username": teacher.username,
+        "name": f"{teacher.last_name} {teacher.first_name}",
+        "faculty_id": teacher.faculty_id,
+        "faculty_name": teacher.faculty_name,
+        "group_id": teacher.group_id
+    }, page)
@@ -0,0 +1,250 @@
+# backend/app/bench/generate.py - синтетическая большая спартакиада для замеров
+"""
+Заполняет базу DATABASE_URL синтетическими данными заданного размера.
+Все существующие данные удаляются. Таблицы загружаются через COPY,
+затем баллы и итоги факультетов пересчитываются штатным кодом.
+
+    python -m app.bench.generate --faculties 40 --students 50000 --sports 30
+
+Сводка (размер данных и время этапов) печатается в формате JSON.
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import text
+
+from ..api.auth import get_password_hash
+from ..api.results import recalculate_competition_points, update_faculty_results_all
+from ..database import Base, SessionLocal, engine
+from ..models.student import Gender
+from ..models.user import UserRole
+from ..utils.ranking import normalize_result
+from ..utils.seed_data import generate_realistic_result
+from ..utils.sport_registry import SportScoring, sport_registry
+
+# Шаблоны видов спорта: (название, командный, меньше - лучше, шаг округления)
+SPORT_TEMPLATES = (
+    ("Бег 100м", False, True, 0.01),
+    ("Бег 1000м", False, True, 0.01),
+    ("Плавание", False, True, 0.01),
+    ("Шахматы", False, False, 0.0),
+    ("Настольный теннис", False, False, 0.0),
+    ("Баскетбол", True, False, 0.0),
+    ("Волейбол", True, False, 0.0),
+    ("Футбол", True, False, 0.0),
+)
+
+FIRST_NAMES = {
+    Gender.MALE: ("Александр", "Сергей", "Максим", "Артем", "Илья", "Дмитрий", "Андрей", "Михаил",
+                  "Николай", "Владимир", "Иван", "Егор", "Кирилл", "Роман", "Тимур", "Павел"),
+    Gender.FEMALE: ("Екатерина", "Анастасия", "Дарья", "Полина", "София", "Мария", "Анна", "Елена",
+                    "Ольга", "Наталья", "Алина", "Виктория", "Ксения", "Юлия", "Вера", "Ирина"),
+}
+LAST_NAMES = ("Новожилов", "Черных", "Серебряков", "Зайцев", "Медведев", "Волков", "Соколов", "Козлов",
+              "Морозов", "Лебедев", "Белов", "Золотов", "Красников", "Лисицын", "Орлов", "Петров",
+              "Смирнов", "Кузнецов", "Попов", "Васильев", "Федоров", "Михайлов", "Никитин", "Егоров")
+MIDDLE_NAMES = {
+    Gender.MALE: ("Андреевич", "Иванович", "Олегович", "Николаевич", "Петрович", "Сергеевич"),
+    Gender.FEMALE: ("Дмитриевна", "Павловна", "Алексеевна", "Сергеевна", "Андреевна", "Ивановна"),
+}
+
+
+def last_name(base: str, gender: Gender) -> str:
+    """Фамилия в форме пола (для фамилий на -ов/-ев/-ин)"""
+    if gender == Gender.FEMALE and base.endswith(("ов", "ев", "ин", "ын")):
+        return base + "а"
+    return base
+
+
+def copy_rows(cursor, table: str, columns, rows):
+    """Загрузить строки в таблицу одной командой COPY (None - NULL)"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def generate(faculties, groups_per_faculty, students, sports, judges, team_size, participation, seed):
+    rng = random.Random(seed)
+    random.seed(seed)  # generate_realistic_result использует модуль random
+    tables = {}
+
+    tables["faculties"] = (
+        ("id", "name", "abbreviation"),
+        [(i, f"Факультет {i}", f"Ф{i:02d}") for i in range(1, faculties + 1)]
+    )
+    groups = [
+        ((faculty_id - 1) * groups_per_faculty + k, f"Ф{faculty_id:02d}-{k:02d}", faculty_id)
+        for faculty_id in range(1, faculties + 1) for k in range(1, groups_per_faculty + 1)
+    ]
+    tables["groups"] = (("id", "number", "faculty_id"), groups)
+
+    # Студенты поровну по полу, группы случайно
+    student_rows = []
+    by_faculty_gender = defaultdict(list)
+    faculty_of_group = {group[0]: group[2] for group in groups}
+    for student_id in range(1, students + 1):
+        gender = Gender.MALE if student_id % 2 else Gender.FEMALE
+        group_id = rng.choice(groups)[0]
+        student_rows.append((
+            student_id,
+            rng.choice(FIRST_NAMES[gender]),
+            last_name(rng.choice(LAST_NAMES), gender),
+            rng.choice(MIDDLE_NAMES[gender]),
+            gender.name,
+            group_id
+        ))
+        by_faculty_gender[(faculty_of_group[group_id], gender)].append(student_id)
+    tables["students"] = (("id", "first_name", "last_name", "middle_name", "gender", "group_id"), student_rows)
+
+    sport_rows = []
+    for sport_id in range(1, sports + 1):
+        name, is_team, lower_is_better, tie_tolerance = SPORT_TEMPLATES[(sport_id - 1) % len(SPORT_TEMPLATES)]
+        if sport_id > len(SPORT_TEMPLATES):
+            name = f"{name} {(sport_id - 1) // len(SPORT_TEMPLATES) + 1}"
+        sport_rows.append((sport_id, name, is_team, lower_is_better, tie_tolerance))
+    tables["sport_types"] = (("id", "name", "is_team", "lower_is_better", "tie_tolerance"), sport_rows)
+
+    # Пользователи: admin/admin123 и судьи judgeN/password123 (один хэш на всех)
+    judge_hash = get_password_hash("password123")
+    users = [(1, "Админ", "Админов", "admin", get_password_hash("admin123"), UserRole.ADMIN.name)]
+    users += [
+        (i + 1, "Судья", f"Судейский{i}", f"judge{i}", judge_hash, UserRole.JUDGE.name)
+        for i in range(1, judges + 1)
+    ]
+    tables["users"] = (("id", "first_name", "last_name", "username", "hashed_password", "role"), users)
+    tables["judges"] = (
+        ("id", "user_id", "sport_type_id"),
+        [(i, i + 1, (i - 1) % sports + 1) for i in range(1, judges + 1)]
+    )
+
+    tables["competitions"] = (
+        ("id", "name", "sport_type_id", "date", "location"),
+        [(sport[0], f"Соревнование: {sport[1]}", sport[0], datetime.now().isoformat(), "Стадион")
+         for sport in sport_rows]
+    )
+
+    gender_of = {row[0]: Gender[row[4]] for row in student_rows}
+    faculty_of = {row[0]: faculty_of_group[row[5]] for row in student_rows}
+    teams, team_students, competition_teams, performances = [], [], [], []
+
+    def add_performance(student_id, sport, scoring, time_result, original_result):
+        performances.append((
+            student_id, sport[0], sport[0], (sport[0] - 1) % judges + 1, 0, time_result, original_result,
+            normalize_result(time_result, original_result, scoring),
+            faculty_of[student_id], gender_of[student_id].name
+        ))
+
+    for sport in sport_rows:
+        template_name = SPORT_TEMPLATES[(sport[0] - 1) % len(SPORT_TEMPLATES)][0]
+        scoring = SportScoring(*sport)
+        if sport[2]:
+            # Командный вид: команда факультета для каждого пола, у всех участников результат команды
+            for (faculty_id, gender), members in sorted(by_faculty_gender.items()):
+                team_id = len(teams) + 1
+                teams.append((team_id, sport[0], faculty_id))
+                competition_teams.append((sport[0], team_id))
+                time_result, original_result = generate_realistic_result(
+                    template_name, gender.value, rng.random() < 0.3
+                )
+                for student_id in rng.sample(members, min(team_size, len(members))):
+                    team_students.append((team_id, student_id))
+                    add_performance(student_id, sport, scoring, time_result, original_result)
+        else:
+            for student_id in rng.sample(range(1, students + 1), int(students * participation)):
+                time_result, original_result = generate_realistic_result(
+                    template_name, gender_of[student_id].value, rng.random() < 0.3
+                )
+                add_performance(student_id, sport, scoring, time_result, original_result)
+
+    tables["teams"] = (("id", "sport_type_id", "faculty_id"), teams)
+    tables["team_students"] = (("team_id", "student_id"), team_students)
+    tables["competition_teams"] = (("competition_id", "team_id"), competition_teams)
+    tables["student_performances"] = (
+        ("student_id", "sport_type_id", "competition_id", "judge_id", "points", "time_result",
+         "original_result", "result_value", "faculty_id", "gender"),
+        performances
+    )
+    return tables
+
+
+def load(tables):
+    """Очистить базу и загрузить таблицы через COPY"""
+    Base.metadata.create_all(bind=engine)
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("TRUNCATE %s RESTART IDENTITY CASCADE" % ", ".join(
+            table.name for table in Base.metadata.sorted_tables
+        ))
+        # Порядок по внешним ключам
+        for table in Base.metadata.sorted_tables:
+            if table.name in tables:
+                columns, rows = tables[table.name]
+                copy_rows(cursor, table.name, columns, rows)
+                if "id" in columns:
+                    cursor.execute(
+                        f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                        f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {table.name}), false)"
+                    )
+        cursor.execute("ANALYZE")
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def score(sports):
+    """Пересчитать баллы и итоги штатным кодом"""
+    with SessionLocal() as db:
+        sport_registry.load(db)
+        for sport_type_id in range(1, sports + 1):
+            recalculate_competition_points(db, sport_type_id)
+        update_faculty_results_all(db)
+        db.execute(text("ANALYZE"))
+        db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faculties", type=int, default=40)
+    parser.add_argument("--groups-per-faculty", type=int, default=10)
+    parser.add_argument("--students", type=int, default=50000)
+    parser.add_argument("--sports", type=int, default=30)
+    parser.add_argument("--judges", type=int, default=30)
+    parser.add_argument("--team-size", type=int, default=8, help="Участников в команде факультета")
+    parser.add_argument("--participation", type=float, default=0.1,
+                        help="Доля студентов, выступающих в каждом индивидуальном виде спорта")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    timings = {}
+    started = time.perf_counter()
+    tables = generate(
+        args.faculties, args.groups_per_faculty, args.students, args.sports,
+        args.judges, args.team_size, args.participation, args.seed
+    )
+    timings["generate_seconds"] = round(time.perf_counter() - started, 3)
+
+    started = time.perf_counter()
+    load(tables)
+    timings["copy_seconds"] = round(time.perf_counter() - started, 3)
+
+    started = time.perf_counter()
+    score(args.sports)
+    timings["score_seconds"] = round(time.perf_counter() - started, 3)
+
+    print(json.dumps({
+        "parameters": vars(args),
+        "rows": {name: len(rows) for name, (_, rows) in tables.items()},
+        **timings
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
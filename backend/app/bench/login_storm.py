@@ -0,0 +1,102 @@
+# backend/app/bench/login_storm.py - задержка синхронных эндпоинтов во время волны входов
+"""
+Измеряет задержку синхронного (выполняемого в пуле потоков) и некэшируемого
+эндпоинта, по умолчанию GET /api/users/judges/, в покое и во время волны
+одновременных входов на уже запущенном сервере. Если bcrypt занимает пул
+потоков запросов, задержка во время входов растет на время очереди к пулу.
+
+    python -m app.bench.login_storm --url http://127.0.0.1:8000 --logins 200
+
+Результат печатается в формате JSON.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def timed_get(url):
+    started = time.perf_counter()
+    with urllib.request.urlopen(url) as response:
+        response.read()
+    return (time.perf_counter() - started) * 1000
+
+
+def login(base_url, username, password):
+    data = urllib.parse.urlencode({"username": username, "password": password}).encode()
+    with urllib.request.urlopen(f"{base_url}/api/auth/login", data=data) as response:
+        response.read()
+
+
+def latency_summary(samples):
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "p50_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 2),
+        "max_ms": round(samples[-1], 2),
+    }
+
+
+def measure_probe(url, stop: threading.Event, interval: float):
+    samples = []
+    while not stop.is_set():
+        samples.append(timed_get(url))
+        time.sleep(interval)
+    return samples
+
+
+def run(base_url, probe_path, username, password, logins, concurrency, duration, interval):
+    probe_url = f"{base_url}{probe_path}"
+    timed_get(probe_url)  # Прогрев
+
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as probe:
+        idle = probe.submit(measure_probe, probe_url, stop, interval)
+        time.sleep(duration)
+        stop.set()
+        idle_samples = idle.result()
+
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as probe, ThreadPoolExecutor(max_workers=concurrency) as storm:
+        during = probe.submit(measure_probe, probe_url, stop, interval)
+        started = time.perf_counter()
+        for future in [storm.submit(login, base_url, username, password) for _ in range(logins)]:
+            future.result()
+        storm_seconds = time.perf_counter() - started
+        stop.set()
+        storm_samples = during.result()
+
+    return {
+        "logins": logins,
+        "concurrency": concurrency,
+        "logins_per_second": round(logins / storm_seconds, 1),
+        "probe": probe_path,
+        "probe_idle": latency_summary(idle_samples),
+        "probe_during_logins": latency_summary(storm_samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--probe", default="/api/users/judges/",
+                        help="Путь синхронного эндпоинта без кэша, задержку которого измерять")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=3.0, help="Длительность замера в покое, с")
+    parser.add_argument("--interval", type=float, default=0.02, help="Пауза между замеряемыми запросами, с")
+    args = parser.parse_args()
+
+    result = run(args.url, args.probe, args.username, args.password, args.logins, args.concurrency, args.duration, args.interval)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
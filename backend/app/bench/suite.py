@@ -0,0 +1,224 @@
+# backend/app/bench/suite.py - замеры горячих путей API
+"""
+Замеряет горячие пути API на текущей базе (DATABASE_URL) в процессе, без
+запущенного сервера: протоколы соревнований, все варианты рейтинга, запись и
+удаление выступления с пересчетом, поиск студентов и состав команды.
+Кэш протоколов и рейтингов сбрасывается перед каждым замером чтения, так что
+измеряется построение ответа, а не выдача из кэша.
+
+    python -m app.bench.generate --faculties 40 --students 50000 --sports 30
+    python -m app.bench.suite --repeat 20 --output bench.json
+
+Результат в формате JSON: задержка (p50/p95/max), число запросов к БД и
+время БД из Server-Timing для каждого замера - для сравнения выпусков.
+"""
+import argparse
+import json
+import logging
+import platform
+import random
+import re
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+
+from ..database import SessionLocal
+from ..main import app
+from ..models import Competition, Faculty, Judge, SportType, Student, StudentPerformance
+from ..utils import ranking
+from ..utils.standings_cache import standings_cache
+from ..utils.startup import startup_state
+from .login_storm import latency_summary
+
+SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Benchmark:
+    """Замеры одного пути: задержка и Server-Timing каждого запроса"""
+
+    def __init__(self):
+        self.samples = []
+        self.queries = []
+        self.db_ms = []
+
+    def record(self, response, elapsed_ms):
+        if response.status_code >= 400:
+            raise RuntimeError(f"{response.request.method} {response.request.url}: {response.status_code} {response.text}")
+        self.samples.append(elapsed_ms)
+        timing = SERVER_TIMING_DB.search(response.headers.get("server-timing", ""))
+        if timing:
+            self.db_ms.append(float(timing.group(1)))
+            self.queries.append(int(timing.group(2)))
+
+    def summary(self):
+        result = latency_summary(self.samples)
+        if self.queries:
+            result["queries_p50"] = statistics.median(self.queries)
+            result["db_p50_ms"] = round(statistics.median(self.db_ms), 2)
+        return result
+
+
+def timed(request):
+    started = time.perf_counter()
+    response = request()
+    return response, (time.perf_counter() - started) * 1000
+
+
+def measure_get(client, repeat, urls):
+    """GET по кругу списка адресов; первый запрос - прогрев"""
+    benchmark = Benchmark()
+    for index in range(repeat + 1):
+        standings_cache.bump()
+        response, elapsed_ms = timed(lambda: client.get(urls[index % len(urls)]))
+        if index:
+            benchmark.record(response, elapsed_ms)
+    return benchmark.summary()
+
+
+def measure_write(client, repeat, sport_type_id, competition_id, judge_id, student_ids):
+    """Запись выступления и его удаление, каждое с пересчетом мест"""
+    insert, delete = Benchmark(), Benchmark()
+    for index, student_id in enumerate(student_ids[:repeat + 1]):
+        body = {
+            "student_id": student_id,
+            "sport_type_id": sport_type_id,
+            "competition_id": competition_id,
+            "judge_id": judge_id,
+            "original_result": round(random.uniform(40, 95), 2)
+        }
+        response, elapsed_ms = timed(lambda: client.post("/api/results/performances/", json=body))
+        if index:
+            insert.record(response, elapsed_ms)
+        performance_id = response.json()["id"]
+        response, elapsed_ms = timed(lambda: client.delete(f"/api/results/performances/{performance_id}"))
+        if index:
+            delete.record(response, elapsed_ms)
+    return insert.summary(), delete.summary()
+
+
+def wait_until_ready(timeout: float = 60):
+    """Прогрев идет в фоне после старта; замеры начинаются после него"""
+    deadline = time.monotonic() + timeout
+    while not startup_state.ready:
+        if time.monotonic() > deadline:
+            raise RuntimeError("Приложение не прогрелось за %s с" % timeout)
+        time.sleep(0.05)
+
+
+def measure_all(client, repeat, sports, team_sport, individual_sport, faculty_ids, search_terms):
+    """Замеры чтения: протоколы, рейтинги, поиск и состав команды"""
+    results = "/api/results/competition-results/?sport_type_id=%s"
+    rating = "/api/results/faculty-sport-rating/"
+    benchmarks = {
+        "competition_results[individual]": measure_get(client, repeat, [results % individual_sport]),
+        "competition_results[individual,gender]": measure_get(client, repeat, [
+            results % individual_sport + "&gender=М", results % individual_sport + "&gender=Ж"
+        ]),
+        "competition_results[team]": measure_get(client, repeat, [results % team_sport]),
+        "competition_results[team,gender]": measure_get(client, repeat, [
+            results % team_sport + "&gender=М", results % team_sport + "&gender=Ж"
+        ]),
+        "faculty_sport_rating[sport,gender]": measure_get(client, repeat, [
+            f"{rating}?sport_type_id={sport.id}&gender=М" for sport in sports
+        ]),
+        "faculty_sport_rating[sport]": measure_get(client, repeat, [
+            f"{rating}?sport_type_id={sport.id}" for sport in sports
+        ]),
+        "faculty_sport_rating[gender]": measure_get(client, repeat, [f"{rating}?gender=М", f"{rating}?gender=Ж"]),
+        "faculty_sport_rating[overall]": measure_get(client, repeat, [rating]),
+        "spartakiada_rating": measure_get(client, repeat, ["/api/results/spartakiada-rating/"]),
+        "student_search": measure_get(client, repeat, [
+            f"/api/students/?search={term}" for term in search_terms
+        ]),
+        # Со страницей, а не потоком: иначе запросы из тела ответа не попадут в Server-Timing
+        "team_roster": measure_get(client, repeat, [
+            f"/api/students/team_by_sport_faculty?sport_type_id={team_sport}&faculty_id={faculty_id}"
+            f"&gender=М&limit=100"
+            for faculty_id in faculty_ids
+        ]),
+    }
+    return benchmarks
+
+
+def run(repeat, seed):
+    random.seed(seed)
+    with SessionLocal() as db:
+        dataset = {
+            "faculties": db.query(func.count(Faculty.id)).scalar(),
+            "students": db.query(func.count(Student.id)).scalar(),
+            "sport_types": db.query(func.count(SportType.id)).scalar(),
+            "student_performances": db.query(func.count(StudentPerformance.id)).scalar(),
+        }
+        sports = db.query(SportType.id, SportType.is_team, SportType.lower_is_better).order_by(SportType.id).all()
+        team_sport = next(sport.id for sport in sports if sport.is_team)
+        # Запись меряется на очковом виде: результат - число, без разбора времени
+        individual_sport = next(sport.id for sport in sports if not sport.is_team and not sport.lower_is_better)
+        faculty_ids = [faculty_id for (faculty_id,) in db.query(Faculty.id).order_by(Faculty.id)]
+        competition_id = db.query(func.min(Competition.id)).filter(Competition.sport_type_id == individual_sport).scalar()
+        judge_id = db.query(func.min(Judge.id)).scalar()
+        # Студенты, еще не выступавшие в этом соревновании
+        taken = db.query(StudentPerformance.student_id).filter(StudentPerformance.competition_id == competition_id)
+        free_students = [
+            student_id for (student_id,) in db.query(Student.id).filter(
+                Student.group_id.isnot(None), Student.id.notin_(taken)
+            ).order_by(Student.id).limit(repeat + 1)
+        ]
+        search_terms = sorted({
+            last_name[:4] for (last_name,) in db.query(Student.last_name).distinct().limit(50)
+        })
+
+    with TestClient(app) as client:
+        wait_until_ready()
+        benchmarks = measure_all(
+            client, repeat, sports, team_sport, individual_sport, faculty_ids, search_terms
+        )
+        benchmarks["performance_insert"], benchmarks["performance_delete"] = measure_write(
+            client, repeat, individual_sport, competition_id, judge_id, free_students
+        )
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "numpy": ranking.np is not None,
+        "repeat": repeat,
+        "dataset": dataset,
+        "benchmarks": benchmarks,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Замеров на каждый путь (плюс один прогрев)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Файл для результата; по умолчанию stdout")
+    args = parser.parse_args()
+
+    # Строки лога на каждый запрос не нужны: время и число запросов попадают в результат
+    logging.getLogger("app.requests").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    result = json.dumps(run(args.repeat, args.seed), ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(result + "\n", encoding="utf-8")
+    else:
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,221 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Dict
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from .config import settings
+from .utils.read_routing import ReadRouting
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+class PoolMetrics:
+    """Счетчики ожидания соединений из пула"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+# Счетчики ожидания по движкам: primary (синхронный), primary_async, replica
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+class TimedPoolMixin:
+    """Учет времени ожидания свободного соединения; счетчики задает timed_pool_class"""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - started)
+        return connection
+
+
+def timed_pool_class(base, label: str):
+    """
+    Класс пула base со счетчиками движка label. Счетчики - атрибут класса,
+    поэтому переживают пересоздание пула (Pool.recreate создает пул того же класса).
+    """
+    metrics = pool_metrics.setdefault(label, PoolMetrics())
+    return type(f"Timed{base.__name__}", (TimedPoolMixin, base), {"metrics": metrics})
+
+
+def engine_options(url: str, label: str = "primary") -> dict:
+    """Параметры пула и соединений из настроек (для PostgreSQL)"""
+    if make_url(url).get_backend_name() != "postgresql":
+        return {}
+
+    if settings.DB_PGBOUNCER:
+        # Пулом соединений управляет PgBouncer (transaction pooling): свой пул не держим,
+        # параметры сессии в стартовом пакете PgBouncer не пропускает
+        return {"poolclass": NullPool, "pool_pre_ping": settings.DB_POOL_PRE_PING}
+
+    options = {
+        "poolclass": timed_pool_class(QueuePool, label),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+def async_database_url(url: str):
+    """URL того же сервера для асинхронного драйвера (asyncpg)"""
+    url = make_url(url)
+    if url.get_backend_name() == "postgresql":
+        return url.set(drivername="postgresql+asyncpg")
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+def async_engine_options(url: str, label: str) -> dict:
+    """Параметры асинхронного движка: те же настройки пула, что и у синхронного"""
+    if make_url(url).get_backend_name() != "postgresql":
+        return {}
+
+    if settings.DB_PGBOUNCER:
+        # PgBouncer в режиме transaction pooling не поддерживает подготовленные выражения asyncpg
+        return {
+            "poolclass": NullPool,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+            "connect_args": {"statement_cache_size": 0, "prepared_statement_cache_size": 0},
+        }
+
+    options = {
+        "poolclass": timed_pool_class(AsyncAdaptedQueuePool, label),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+    return options
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL))
+
+# Асинхронный движок для эндпоинтов только на чтение: запросы не занимают пул потоков
+async_engine = create_async_engine(
+    async_database_url(SQLALCHEMY_DATABASE_URL),
+    **async_engine_options(SQLALCHEMY_DATABASE_URL, "primary_async")
+)
+
+# Реплика для чтения (если настроена)
+if settings.READ_DATABASE_URL:
+    read_async_engine = create_async_engine(
+        async_database_url(settings.READ_DATABASE_URL),
+        **async_engine_options(settings.READ_DATABASE_URL, "replica")
+    )
+else:
+    read_async_engine = async_engine
+
+read_routing = ReadRouting(
+    read_async_engine is not async_engine,
+    settings.READ_YOUR_WRITES_SECONDS,
+    settings.READ_REPLICA_MAX_LAG_SECONDS
+)
+
+if settings.DB_PGBOUNCER and settings.DB_STATEMENT_TIMEOUT_MS and engine.dialect.name == "postgresql":
+    @event.listens_for(engine, "begin")
+    @event.listens_for(async_engine.sync_engine, "begin")
+    def _set_statement_timeout(connection):
+        # SET LOCAL действует до конца транзакции и не переходит к другим клиентам PgBouncer
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+ReadSessionLocal = async_sessionmaker(read_async_engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
+
+def engine_pools() -> Dict[str, object]:
+    """Пулы соединений процесса по движкам (реплика - если настроена)"""
+    pools = {"primary": engine.pool, "primary_async": async_engine.pool}
+    if read_async_engine is not async_engine:
+        pools["replica"] = read_async_engine.pool
+    return pools
+
+
+def pool_status() -> Dict[str, dict]:
+    """Состояние пулов соединений и накопленные счетчики ожидания по движкам"""
+    statuses = {}
+    for label, pool in engine_pools().items():
+        metrics = pool_metrics.get(label) or PoolMetrics()  # Без своего пула (PgBouncer) ожидания нет
+        status = {
+            "pool_class": type(pool).__name__,
+            "checkouts": metrics.checkouts,
+            "timeouts": metrics.timeouts,
+            "wait_seconds_total": round(metrics.wait_seconds_total, 6),
+            "wait_seconds_max": round(metrics.wait_seconds_max, 6),
+        }
+        if isinstance(pool, QueuePool):
+            status.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+            })
+        statuses[label] = status
+    return statuses
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    """Асинхронная сессия для чтения; записи идут через get_db"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_db(request: Request):
+    """
+    Асинхронная сессия для чистого чтения: с реплики, если она настроена,
+    не отстает и клиент недавно ничего не записывал; иначе с основной базы.
+    """
+    use_replica = (
+        read_routing.enabled
+        and not read_routing.recent_writer(request)
+        and await read_routing.replica_fresh(read_async_engine)
+    )
+    async with (ReadSessionLocal if use_replica else AsyncSessionLocal)() as db:
+        yield db
@@ -1,18 +1,20 @@
 # backend/app/main.py - ПОЛНАЯ ВЕРСИЯ
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from .api import auth, users, students, competitions, results
-from .database import engine, Base
+from .database import async_engine, engine, pool_status, read_async_engine, read_routing
+from .utils.pagination import NEXT_CURSOR_HEADER
+from .utils.metrics import CONTENT_TYPE, MetricsMiddleware, pool_samples, registry
+from .utils.query_stats import QueryStatsMiddleware, instrument_engine
+from .utils.read_routing import ReadYourWritesMiddleware
+from .utils.startup import startup_state, start_warmup
 import logging
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Создание таблиц в базе данных
-Base.metadata.create_all(bind=engine)
-
 app = FastAPI(
     title="Spartakiada API",
     version="1.0.0",
@@ -28,8 +30,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Server-Timing"],
 )
 
+# Клиент, только что записавший данные, читает их с основной базы, а не с реплики
+app.add_middleware(ReadYourWritesMiddleware, routing=read_routing)
+
+# Число запросов к БД и время БД на каждый запрос: заголовок Server-Timing и лог
+for instrumented_engine in (engine, async_engine.sync_engine, read_async_engine.sync_engine):
+    instrument_engine(instrumented_engine)
+app.add_middleware(QueryStatsMiddleware)
+
+# Задержка по маршрутам и число запросов в обработке для /metrics
+app.add_middleware(MetricsMiddleware)
+registry.collector(lambda: pool_samples(pool_status()))
+
 # Подключение роутеров
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
@@ -60,17 +75,35 @@ def read_root():
 # Health check endpoint
 @app.get("/health")
 def health_check():
-    """Проверка состояния сервиса"""
-    try:
-        # Можно добавить проверку подключения к БД
-        return {
-            "status": "healthy",
-            "version": "1.0.0",
-            "service": "Spartakiada API"
-        }
-    except Exception as e:
-        logger.error(f"Health check failed: {e}")
-        raise HTTPException(status_code=503, detail="Service unavailable")
+    """Проверка состояния сервиса: 503, пока не закончен прогрев"""
+    if not startup_state.ready:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "starting",
+                "version": "1.0.0",
+                "service": "Spartakiada API",
+                "warmup_attempts": startup_state.attempts
+            }
+        )
+    return {
+        "status": "healthy",
+        "version": "1.0.0",
+        "service": "Spartakiada API",
+        "warmup_seconds": startup_state.warmup_seconds
+    }
+
+# Состояние пулов соединений с БД
+@app.get("/health/db-pool")
+def db_pool_health():
+    """Занятость пулов соединений (по движкам) и время ожидания соединения"""
+    return pool_status()
+
+# Метрики для Prometheus
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Метрики процесса в текстовом формате Prometheus"""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
 
 # API информация
 @app.get("/api/info")
@@ -101,7 +134,10 @@ def api_info():
 @app.on_event("startup")
 async def startup_event():
     logger.info("Spartakiada API starting up...")
-    logger.info("Database tables created successfully")
+
+    # Схема не проверяется при импорте; пул, справочники и индексы поиска
+    # готовятся в фоне, о готовности сообщает /health
+    start_warmup()
 
 # Shutdown event  
 @app.on_event("shutdown")
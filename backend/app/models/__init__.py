@@ -3,4 +3,4 @@ from .student import Student
 from .faculty import Faculty, Group
 from .sport import SportType, Team, team_students
 from .competition import Competition
-from .results import StudentPerformance, FacultyCompetitionResult, FacultyTotalPoints
\ No newline at end of file
+from .results import StudentPerformance, FacultyCompetitionResult, FacultyStanding, FacultyTotalPoints
\ No newline at end of file
@@ -22,7 +22,7 @@ class Group(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     number = Column(String, nullable=False)
-    faculty_id = Column(Integer, ForeignKey("faculties.id"))
+    faculty_id = Column(Integer, ForeignKey("faculties.id"), index=True)
 
     faculty = relationship("Faculty", back_populates="groups")
     students = relationship("Student", back_populates="group")
@@ -1,7 +1,8 @@
 # backend/app/models/results.py - ИСПРАВЛЕННАЯ ВЕРСИЯ без warnings
-from sqlalchemy import Column, Integer, Float, ForeignKey, UniqueConstraint, String, Table
+from sqlalchemy import Column, Integer, Float, ForeignKey, UniqueConstraint, String, Table, Index, Enum
 from sqlalchemy.orm import relationship
 from ..database import Base
+from .student import Gender
 
 
 class StudentPerformance(Base):
@@ -15,15 +16,22 @@ class StudentPerformance(Base):
     points = Column(Float, nullable=False)  # Баллы за место (1-10 или 1)
     time_result = Column(String)  # For time-based results like "1:36:45"
     original_result = Column(Float)  # Исходный результат (время в секундах, очки за игру и т.д.)
+    result_value = Column(Float)  # Нормализованный результат: секунды или -очки, чем меньше, тем выше место
+    # Факультет и пол участника на момент записи, чтобы ранжирование не соединяло students и groups
+    faculty_id = Column(Integer, ForeignKey("faculties.id"))
+    gender = Column(Enum(Gender))
 
     # Relationships
     student = relationship("Student", back_populates="performances")
     sport_type = relationship("SportType", back_populates="performances")
     competition = relationship("Competition", back_populates="performances")
     judge = relationship("Judge", back_populates="performances")
+    faculty = relationship("Faculty")
 
     __table_args__ = (
         UniqueConstraint('student_id', 'competition_id', name='_student_competition_uc'),
+        Index('ix_student_performances_sport_result', 'sport_type_id', 'result_value'),
+        Index('ix_student_performances_sport_gender_faculty', 'sport_type_id', 'gender', 'faculty_id'),
     )
 
 
@@ -54,6 +62,25 @@ class FacultyCompetitionResult(Base):
     )
 
 
+class FacultyStanding(Base):
+    """Сумма баллов факультета по виду спорта для одного пола (поддерживается при записи результатов)"""
+    __tablename__ = "faculty_standings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    faculty_id = Column(Integer, ForeignKey("faculties.id"), nullable=False)
+    sport_type_id = Column(Integer, ForeignKey("sport_types.id"), nullable=False)
+    gender = Column(Enum(Gender), nullable=False)
+    total_points = Column(Float, nullable=False)
+
+    faculty = relationship("Faculty")
+
+    __table_args__ = (
+        UniqueConstraint('faculty_id', 'sport_type_id', 'gender', name='_faculty_sport_gender_uc'),
+        # Рейтинг вида спорта для пола читается одним диапазоном индекса
+        Index('ix_faculty_standings_sport_gender_points', 'sport_type_id', 'gender', 'total_points'),
+    )
+
+
 total_points_results = Table('total_points_results', Base.metadata,
                              Column('total_points_id', Integer, ForeignKey('faculty_total_points.id'),
                                     primary_key=True),
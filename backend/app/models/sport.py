@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, ForeignKey, Table, Boolean, Float, JSON
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -13,6 +13,11 @@ class SportType(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, nullable=False)
+    # Правила подсчета; пустые значения выводятся из названия (см. utils/sport_registry.py)
+    is_team = Column(Boolean)  # Командный вид спорта
+    lower_is_better = Column(Boolean)  # Меньший результат лучше (время)
+    tie_tolerance = Column(Float, default=0)  # Допуск равенства соседних результатов при ранжировании
+    points_table = Column(JSON)  # Баллы за 1, 2, ... место; места ниже получают баллы последнего
 
     judges = relationship("Judge", back_populates="sport_type")
     teams = relationship("Team", back_populates="sport_type")
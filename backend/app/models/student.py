@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 import enum
@@ -21,4 +21,9 @@ class Student(Base):
 
     group = relationship("Group", back_populates="students")
     teams = relationship("Team", secondary="team_students", back_populates="students")
-    performances = relationship("StudentPerformance", back_populates="student")
\ No newline at end of file
+    performances = relationship("StudentPerformance", back_populates="student")
+
+    __table_args__ = (
+        # Поиск студента по ФИО и полу при регистрации (find-or-create)
+        Index('ix_students_identity', 'last_name', 'first_name', 'gender'),
+    )
\ No newline at end of file
@@ -7,5 +7,6 @@ from .competition import CompetitionCreate, CompetitionRead
 from .results import (
     StudentPerformanceCreate, StudentPerformanceRead, StudentPerformanceUpdate,
     FacultyCompetitionResultRead, FacultyTotalPointsRead,
-    CompetitionResultsFilter, StudentPerformanceDetail
+    CompetitionResultsFilter, StudentPerformanceDetail,
+    PerformanceImportRow, PerformanceImportResult
 )
\ No newline at end of file
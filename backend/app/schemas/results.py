@@ -72,6 +72,24 @@ class FacultyTotalPointsRead(BaseModel):
         from_attributes = True
 
 
+class PerformanceImportRow(BaseModel):
+    """Строка протокола для пакетной загрузки результатов"""
+    full_name: str  # "Фамилия Имя [Отчество]"
+    faculty_abbreviation: str
+    gender: str
+    time_result: Optional[str] = None
+    original_result: Optional[float] = None
+    judge_id: Optional[int] = None  # По умолчанию судья из параметров запроса
+
+
+class PerformanceImportResult(BaseModel):
+    competition_id: int
+    sport_type_id: int
+    imported: int
+    skipped: int  # Уже существующие выступления и повторы внутри протокола
+    students_created: int
+
+
 class CompetitionResultsFilter(BaseModel):
     sport_type_id: Optional[int] = None
     gender: Optional[str] = None
\ No newline at end of file
@@ -4,6 +4,10 @@ from typing import List, Optional
 
 class SportTypeBase(BaseModel):
     name: str
+    is_team: Optional[bool] = None
+    lower_is_better: Optional[bool] = None
+    tie_tolerance: Optional[float] = None
+    points_table: Optional[List[float]] = None
 
 
 class SportTypeCreate(SportTypeBase):
@@ -0,0 +1,81 @@
+# backend/app/utils/live_hub.py - рассылка изменений протоколов подписчикам (SSE)
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Set
+
+# Сколько событий может накопиться у медленного подписчика до принудительной ресинхронизации
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class LiveHub:
+    """
+    Раздает события об изменении результатов всем подключенным клиентам.
+
+    Событие формируется один раз при записи результата и раскладывается по
+    очередям подписчиков в цикле событий, поэтому число зрителей не влияет на
+    нагрузку на базу данных. Публиковать можно из синхронных эндпоинтов,
+    которые FastAPI выполняет в пуле потоков.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Dict[Optional[int], Set[asyncio.Queue]] = {}
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    @asynccontextmanager
+    async def subscribe(self, sport_type_id: Optional[int] = None):
+        """Подписаться на события вида спорта (None - на все виды спорта)"""
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(sport_type_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(sport_type_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[sport_type_id]
+
+    def publish(self, sport_type_id: Optional[int], event: dict):
+        """
+        Опубликовать событие вида спорта (None - всем подписчикам).
+        Безопасно вызывать из любого потока.
+        """
+        if self._loop is None or not self._subscribers:
+            return
+        message = format_sse(event)
+        try:
+            self._loop.call_soon_threadsafe(self._dispatch, sport_type_id, message)
+        except RuntimeError:
+            # Цикл событий уже остановлен
+            self._loop = None
+
+    def _dispatch(self, sport_type_id: Optional[int], message: str):
+        if sport_type_id is None:
+            queues = [queue for group in self._subscribers.values() for queue in group]
+        else:
+            queues = [*self._subscribers.get(sport_type_id, ()), *self._subscribers.get(None, ())]
+
+        for queue in queues:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Клиент не успевает: отбрасываем накопленное и просим перечитать протокол
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(format_sse({"type": "resync", "sport_type_id": sport_type_id}))
+
+
+def format_sse(event: dict) -> str:
+    """Сериализовать событие в формат Server-Sent Events"""
+    data = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event['type']}\ndata: {data}\n\n"
+
+
+live_hub = LiveHub()
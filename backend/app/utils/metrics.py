@@ -0,0 +1,240 @@
+# backend/app/utils/metrics.py - метрики в текстовом формате Prometheus
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Границы корзин гистограмм задержки, секунды
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+
+# Тип содержимого текстового формата Prometheus (charset добавляет Response)
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def format_labels(labelnames: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [
+        '%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(labelnames, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{%s}" % ",".join(pairs) if pairs else ""
+
+
+class Metric:
+    """Метрика с метками; значения хранятся по кортежу значений меток"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+        if not self.labelnames:
+            self._values[()] = 0  # Метрика без меток видна с нуля, до первого события
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{format_labels(self.labelnames, key)} {value}" for key, value in values]
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}  # метки -> [счетчики корзин..., +Inf, сумма]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = [(key, list(values)) for key, values in self._series.items()]
+        lines = []
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), values[:-1]):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labelnames, key)} {values[-1]}")
+            lines.append(f"{self.name}_count{format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """
+    Метрики процесса. Значения, которые проще прочитать в момент сбора
+    (например, состояние пула соединений), отдают функции-сборщики.
+    """
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, collect: Callable[[], List[str]]):
+        self._collectors.append(collect)
+        return collect
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            lines.extend(collect())
+        return "\n".join(lines) + "\n"
+
+
+def pool_samples(statuses: Dict[str, dict]) -> List[str]:
+    """Метрики пулов соединений из pool_status(): движок (primary, primary_async, replica) - в метке engine"""
+    lines = []
+    for key, kind, documentation in (
+            ("checkouts", "counter", "Выдачи соединений из пула"),
+            ("timeouts", "counter", "Ожидания соединения, завершившиеся тайм-аутом"),
+            ("wait_seconds_total", "counter", "Суммарное ожидание соединения, секунды"),
+            ("wait_seconds_max", "gauge", "Наибольшее ожидание соединения, секунды"),
+            ("size", "gauge", "Размер пула"),
+            ("checked_in", "gauge", "Свободные соединения"),
+            ("checked_out", "gauge", "Занятые соединения"),
+            ("overflow", "gauge", "Соединения сверх размера пула"),
+            ("max_overflow", "gauge", "Допустимое число соединений сверх размера пула"),
+    ):
+        values = [(engine, status[key]) for engine, status in statuses.items() if key in status]
+        if not values:
+            continue
+        name = "db_pool_" + key
+        if kind == "counter" and not name.endswith("_total"):
+            name += "_total"
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+        lines += [f"{name}{format_labels(('engine',), (engine,))} {value}" for engine, value in values]
+    return lines
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Длительность обработки HTTP-запроса", ("method", "route", "status")
+))
+http_requests_in_progress = registry.register(Gauge(
+    "http_requests_in_progress", "HTTP-запросы в обработке", ("method",)
+))
+recalculations = registry.register(Counter(
+    "spartakiada_recalculations_total", "Полные пересчеты баллов вида спорта"
+))
+rows_reranked = registry.register(Counter(
+    "spartakiada_rows_reranked_total", "Выступления, у которых изменились баллы"
+))
+standings_cache_requests = registry.register(Counter(
+    "spartakiada_standings_cache_requests_total", "Обращения к кэшу протоколов и рейтингов", ("result",)
+))
+operation_duration = registry.register(Histogram(
+    "spartakiada_operation_duration_seconds", "Длительность пересчетов результатов", ("operation",)
+))
+
+
+def timed(operation: str):
+    """Декоратор: время выполнения функции в гистограмме spartakiada_operation_duration_seconds"""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with operation_duration.time(operation=operation):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware: гистограмма задержки по шаблону маршрута и число
+    запросов в обработке. Метрики собираются в каждом процессе отдельно.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths = None  # endpoint -> шаблон пути маршрута
+
+    def route_path(self, scope) -> str:
+        if self._route_paths is None:
+            self._route_paths = {
+                route.endpoint: route.path
+                for route in scope["app"].routes if hasattr(route, "endpoint")
+            }
+        # Неизвестные пути не попадают в метки, чтобы число рядов не росло
+        return self._route_paths.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc(method=method)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_progress.dec(method=method)
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                method=method, route=self.route_path(scope), status=status
+            )
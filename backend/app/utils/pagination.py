@@ -0,0 +1,116 @@
+# backend/app/utils/pagination.py - курсорная пагинация и потоковая выдача списков
+import base64
+import json
+from typing import Any, Callable, Optional, Sequence
+
+from fastapi import HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Максимальный размер страницы
+MAX_PAGE_LIMIT = 1000
+
+# Сколько строк читать из серверного курсора за раз при потоковой выдаче
+STREAM_BATCH_SIZE = 500
+
+# Заголовок с курсором следующей страницы
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """
+    Параметры списка (зависимость FastAPI).
+
+    cursor/limit - страница по ключу (sort_key, id) без OFFSET: курсор следующей
+    страницы возвращается в заголовке X-Next-Cursor. stream=true - весь список
+    построчно в формате NDJSON. Без параметров список отдается JSON-массивом
+    потоком с серверного курсора.
+    """
+
+    def __init__(
+            self,
+            cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor"),
+            limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Размер страницы"),
+            stream: bool = Query(False, description="Отдать весь список в формате NDJSON")
+    ):
+        self.cursor = cursor
+        self.limit = limit
+        self.stream = stream
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    data = json.dumps(list(values), ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+    return values
+
+
+async def stream_json_array(items):
+    """Отдавать JSON-массив по одному элементу, не собирая весь ответ в памяти"""
+    yield "["
+    first = True
+    async for item in items:
+        yield ("" if first else ",") + json.dumps(item, ensure_ascii=False)
+        first = False
+    yield "]"
+
+
+async def stream_ndjson(items):
+    """Отдавать элементы по одному на строку (NDJSON)"""
+    async for item in items:
+        yield json.dumps(item, ensure_ascii=False) + "\n"
+
+
+async def paginated_response(
+        db: AsyncSession,
+        stmt: Select,
+        keys: Sequence,
+        serialize: Callable[[Any], dict],
+        page: PageParams,
+        scalars: bool = False,
+        default_limit: Optional[int] = None
+):
+    """
+    Выполнить запрос списка с учетом параметров страницы.
+
+    keys - столбцы ключа сортировки, последним должен идти уникальный id;
+    значения ключа читаются из строки по имени столбца (key.key), поэтому
+    столбец, выбранный под меткой, передается с той же меткой. scalars=True - запрос
+    выбирает ORM-объекты одной модели. serialize превращает строку в словарь.
+    """
+    stmt = stmt.order_by(*keys)
+    if page.cursor:
+        stmt = stmt.where(tuple_(*keys) > tuple_(*decode_cursor(page.cursor, len(keys))))
+
+    limit = page.limit or default_limit
+    if page.stream or not limit:
+        if page.limit:
+            stmt = stmt.limit(page.limit)
+
+        async def items():
+            # Отдельная сессия (к той же базе или реплике) живет столько же, сколько поток ответа
+            async with AsyncSession(db.bind, expire_on_commit=False) as stream_db:
+                result = await stream_db.stream(stmt.execution_options(yield_per=STREAM_BATCH_SIZE))
+                async for row in (result.scalars() if scalars else result):
+                    yield serialize(row)
+
+        if page.stream:
+            return StreamingResponse(stream_ndjson(items()), media_type="application/x-ndjson")
+        return StreamingResponse(stream_json_array(items()), media_type="application/json")
+
+    result = await db.execute(stmt.limit(limit))
+    rows = result.scalars().all() if scalars else result.all()
+
+    headers = {}
+    if len(rows) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(rows[-1], key.key) for key in keys)
+    return JSONResponse([serialize(row) for row in rows], headers=headers)
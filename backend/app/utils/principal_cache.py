@@ -0,0 +1,104 @@
+# backend/app/utils/principal_cache.py - кэш аутентифицированных пользователей
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from ..config import settings
+from ..models import User
+from ..models.user import UserRole
+
+# Ключ Session.info со списком пользователей, измененных в текущей транзакции
+CHANGED_USERS_KEY = "principal_cache_changed_users"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Снимок пользователя, прошедшего аутентификацию (без привязки к сессии)"""
+    id: int
+    username: str
+    first_name: str
+    last_name: str
+    middle_name: Optional[str]
+    role: UserRole
+
+    @classmethod
+    def from_model(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            middle_name=user.middle_name,
+            role=user.role
+        )
+
+
+class PrincipalCache:
+    """
+    LRU-кэш пользователей по (subject, exp) токена.
+
+    Запись живет не дольше TTL и срока действия токена. Изменение или
+    удаление пользователя в этом процессе сбрасывает его записи после
+    коммита; TTL ограничивает устаревание при изменениях в других воркерах.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # ключ -> (срок, Principal)
+
+    def get(self, key: Hashable) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return principal
+
+    def put(self, key: Hashable, principal: Principal, token_expires_at: Optional[float] = None):
+        expires_at = time.time() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        with self._lock:
+            self._entries[key] = (expires_at, principal)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        """Сбросить все записи пользователя (по всем его токенам)"""
+        with self._lock:
+            for key in [key for key, (_, principal) in self._entries.items() if principal.id == user_id]:
+                del self._entries[key]
+
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_SIZE)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _remember_changed_user(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(CHANGED_USERS_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop(CHANGED_USERS_KEY, ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    session.info.pop(CHANGED_USERS_KEY, None)
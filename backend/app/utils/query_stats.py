@@ -0,0 +1,133 @@
+# backend/app/utils/query_stats.py - счетчик SQL-запросов и времени БД на запрос
+import json
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+request_logger = logging.getLogger("app.requests")
+
+# Ключ Connection.info со временем начала выполняемых запросов
+QUERY_STARTED_KEY = "query_stats_started"
+
+# Сколько символов запроса и параметров попадает в лог
+LOG_STATEMENT_LIMIT = 2000
+
+
+class QueryStats:
+    """Запросы одного HTTP-запроса: число, суммарное время и самый долгий"""
+
+    def __init__(self):
+        self.count = 0
+        self.db_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.db_seconds += elapsed
+        if elapsed > self.slowest_seconds:
+            self.slowest_seconds = elapsed
+            self.slowest_statement = statement
+
+
+# Статистика текущего запроса; потоки пула и гринлеты asyncpg наследуют контекст
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def shorten(value, limit: int = LOG_STATEMENT_LIMIT) -> str:
+    text = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(QUERY_STARTED_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info[QUERY_STARTED_KEY].pop()
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    if settings.SLOW_QUERY_MS and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning(json.dumps({
+            "event": "slow_query",
+            "duration_ms": round(elapsed * 1000, 2),
+            "statement": shorten(statement),
+            "parameters": shorten(parameters) if settings.SLOW_QUERY_LOG_PARAMETERS else None
+        }, ensure_ascii=False))
+
+
+def _handle_error(context):
+    # after_cursor_execute для упавшего запроса не вызывается: время начала снимается здесь,
+    # иначе оно осталось бы в info соединения, вернувшегося в пул
+    if context.connection is not None:
+        started = context.connection.info.get(QUERY_STARTED_KEY)
+        if started:
+            started.pop()
+
+
+def instrument_engine(engine: Engine):
+    """Подключить учет запросов к синхронному движку (для асинхронного - к его sync_engine)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI-middleware: считает запросы к БД за время обработки запроса, отдает
+    их в заголовке Server-Timing и пишет строку лога в формате JSON.
+    Запросы из тела потокового ответа в заголовок уже не попадают.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        started = time.perf_counter()
+        status = None
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total_ms = (time.perf_counter() - started) * 1000
+                server_timing = (
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.count} queries", '
+                    f'app;dur={total_ms:.2f}'
+                )
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", server_timing.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            if settings.REQUEST_STATS_LOG:
+                request_logger.info(json.dumps({
+                    "event": "request",
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                    "queries": stats.count,
+                    "db_ms": round(stats.db_seconds * 1000, 2),
+                    "slowest_query_ms": round(stats.slowest_seconds * 1000, 2),
+                    "slowest_query": shorten(stats.slowest_statement, 200) if stats.slowest_statement else None
+                }, ensure_ascii=False))
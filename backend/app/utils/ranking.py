@@ -0,0 +1,391 @@
+# backend/app/utils/ranking.py - инкрементальный пересчет мест и баллов
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from ..models import StudentPerformance, Student, Group
+from .metrics import rows_reranked
+from .sport_registry import get_points_for_place
+
+try:
+    import numpy as np
+except ImportError:  # Без NumPy ядро ранжирования работает на чистом Python
+    np = None
+
+# Погрешность вычитания float при сравнении с допуском (10.02 - 10.01 > 0.01)
+TOLERANCE_EPSILON = 1e-9
+
+
+def time_to_seconds(time_str):
+    """Перевести время вида "0:01:23.45" в секунды"""
+    if not time_str:
+        return float('inf')
+    parts = time_str.split(':')
+    if len(parts) == 3:
+        return int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
+    return float(time_str)
+
+
+def normalize_result(time_result, original_result, scoring) -> Optional[float]:
+    """
+    Нормализованный результат для хранения в StudentPerformance.result_value:
+    чем меньше, тем выше место; None - результата нет (последние места).
+    scoring - правила подсчета вида спорта (SportScoring). Допуск равенства
+    (tie_tolerance) здесь не применяется: он учитывается при ранжировании.
+    """
+    if scoring.lower_is_better:
+        if time_result:
+            return time_to_seconds(time_result)
+        return original_result
+    return -(original_result or 0)  # Отрицательное для сортировки по убыванию
+
+
+def rank_key(result_value):
+    """Ключ сортировки по нормализованному результату"""
+    return float('inf') if result_value is None else result_value
+
+
+def same_place(previous: float, value: float, tolerance: float) -> bool:
+    """Делят ли место соседние по возрастанию ключи при допуске tolerance"""
+    return value == previous or bool(tolerance) and value - previous <= tolerance + TOLERANCE_EPSILON
+
+
+def rank_places(values, groups=None, order=None, shared=True, tolerance=0.0) -> List[int]:
+    """
+    Места строк за один проход по столбцам.
+
+    Строки с одинаковым groups (например, пол) ранжируются отдельно по
+    возрастанию (values, order). shared=True - равные значения делят место
+    (1, 1, 3), иначе места идут подряд. values - ключи rank_key, order -
+    порядок внутри равных значений (по умолчанию номер строки). tolerance -
+    допуск: соседние значения, отличающиеся не больше чем на него, делят место.
+    """
+    size = len(values)
+    if not size:
+        return []
+    # Группы любого типа (например, Gender) сводятся к номерам
+    codes = {}
+    groups = [0] * size if groups is None else [codes.setdefault(group, len(codes)) for group in groups]
+    order = range(size) if order is None else order
+
+    if np is not None:
+        values, groups, order = np.asarray(values, dtype=float), np.asarray(groups), np.asarray(order)
+        index = np.lexsort((order, values, groups))
+        sorted_groups, sorted_values = groups[index], values[index]
+        positions = np.arange(size)
+        group_start = np.r_[True, sorted_groups[1:] != sorted_groups[:-1]]
+        first_in_group = np.maximum.accumulate(np.where(group_start, positions, 0))
+        if shared:
+            same = sorted_values[1:] == sorted_values[:-1]
+            if tolerance:
+                with np.errstate(invalid="ignore"):  # inf - inf у строк без результата
+                    same |= sorted_values[1:] - sorted_values[:-1] <= tolerance + TOLERANCE_EPSILON
+            run_start = group_start | np.r_[True, ~same]
+            first_in_run = np.maximum.accumulate(np.where(run_start, positions, 0))
+        else:
+            first_in_run = positions
+        places = np.empty(size, dtype=np.int64)
+        places[index] = first_in_run - first_in_group + 1
+        return places.tolist()
+
+    places = [0] * size
+    previous = None
+    group_start = run_start = 0
+    for position, row in enumerate(sorted(range(size), key=lambda row: (groups[row], values[row], order[row]))):
+        if previous is None or groups[row] != groups[previous]:
+            group_start = run_start = position
+        elif not shared or not same_place(values[previous], values[row], tolerance):
+            run_start = position
+        places[row] = run_start - group_start + 1
+        previous = row
+    return places
+
+
+def points_for_places(places, points_table) -> List[float]:
+    """Баллы за места по таблице баллов вида спорта"""
+    if np is not None and places:
+        table = np.asarray(points_table, dtype=float)
+        return table[np.minimum(np.asarray(places), len(table)) - 1].tolist()
+    return [float(get_points_for_place(place, points_table)) for place in places]
+
+
+class RankingBoard:
+    """
+    Отсортированная таблица одного вида спорта для одного пола.
+
+    Позиция таблицы - участник (индивидуальные виды) или команда факультета
+    (командные виды). Команда ранжируется по результату первого по id участника.
+    Вставка и удаление находят позицию двоичным поиском и пересчитывают баллы
+    только начиная с затронутой позиции и лишь пока места еще влияют на баллы.
+    """
+
+    def __init__(self, scoring):
+        self.scoring = scoring
+        self.is_team = scoring.is_team
+        self._order = []  # Отсортированные позиции: (ключ, id первого выступления, id позиции)
+        self._keys = []  # Ключи позиций параллельно _order для двоичного поиска
+        self._members: Dict[int, List[int]] = {}  # id позиции -> id выступлений
+        self._unit_of: Dict[int, int] = {}  # id выступления -> id позиции
+        self._result: Dict[int, float] = {}  # id выступления -> ключ сортировки
+        self._points: Dict[int, Optional[float]] = {}  # id выступления -> сохраненные баллы
+
+    def __len__(self):
+        return len(self._order)
+
+    def load(self, performance_id, faculty_id, key, points):
+        """Добавить сохраненное выступление без пересчета (первичная загрузка)"""
+        unit_id = faculty_id if self.is_team else performance_id
+        self._result[performance_id] = key
+        self._points[performance_id] = points
+        self._unit_of[performance_id] = unit_id
+        insort(self._members.setdefault(unit_id, []), performance_id)
+
+    def build(self):
+        """Отсортировать загруженные позиции"""
+        self._order = sorted(self._entry(unit_id) for unit_id in self._members)
+        self._keys = [entry[0] for entry in self._order]
+
+    def insert(self, performance_id, faculty_id, key):
+        """Добавить выступление и вернуть баллы изменившихся выступлений"""
+        unit_id = faculty_id if self.is_team else performance_id
+        lo = len(self._order)
+        if unit_id in self._members:
+            lo = self._detach(unit_id)
+
+        self._result[performance_id] = key
+        self._points[performance_id] = None
+        self._unit_of[performance_id] = unit_id
+        insort(self._members.setdefault(unit_id, []), performance_id)
+
+        index = self._attach(unit_id)
+        return self._rescore(min(lo, index), index)
+
+    def remove(self, performance_id):
+        """Удалить выступление и вернуть баллы изменившихся выступлений"""
+        unit_id = self._unit_of.pop(performance_id, None)
+        if unit_id is None:
+            return {}
+
+        lo = hi = self._detach(unit_id)
+        self._members[unit_id].remove(performance_id)
+        del self._result[performance_id]
+        del self._points[performance_id]
+
+        if self._members[unit_id]:
+            # Команда могла сместиться: ее первым участником стал другой
+            index = self._attach(unit_id)
+            lo, hi = min(lo, index), index
+        else:
+            del self._members[unit_id]
+
+        return self._rescore(lo, hi)
+
+    def _entry(self, unit_id):
+        first_id = self._members[unit_id][0]
+        return self._result[first_id], first_id, unit_id
+
+    def _detach(self, unit_id):
+        index = bisect_left(self._order, self._entry(unit_id))
+        del self._order[index]
+        del self._keys[index]
+        return index
+
+    def _attach(self, unit_id):
+        entry = self._entry(unit_id)
+        index = bisect_left(self._order, entry)
+        self._order.insert(index, entry)
+        self._keys.insert(index, entry[0])
+        return index
+
+    def _place(self, index):
+        if self.is_team:
+            # Команды получают места подряд, без дележа
+            return index + 1
+        # Одинаковые (в пределах допуска от соседа) результаты делят место: 1, 1, 3, ...
+        start = bisect_left(self._keys, self._keys[index])
+        while start and same_place(self._keys[start - 1], self._keys[start], self.scoring.tie_tolerance):
+            start -= 1
+        return start + 1
+
+    def _rescore(self, lo, hi):
+        """Пересчитать баллы начиная с позиции lo; позиции до hi включительно - обязательно"""
+        changed = {}
+        for index in range(lo, len(self._order)):
+            place = self._place(index)
+            points = self.scoring.points_for_place(place)
+            dirty = False
+            for performance_id in self._members[self._order[index][2]]:
+                if self._points[performance_id] != points:
+                    self._points[performance_id] = points
+                    changed[performance_id] = points
+                    dirty = True
+
+            # Дальше места только сдвигаются за пределами зачетной зоны
+            if not dirty and index >= hi and place > self.scoring.last_scoring_place:
+                break
+        return changed
+
+
+def normalize_results(db: Session, sport_type_id: int, scoring):
+    """Пересчитать result_value по исходным результатам и записать только отличающиеся"""
+    rows = db.query(
+        StudentPerformance.id,
+        StudentPerformance.time_result,
+        StudentPerformance.original_result,
+        StudentPerformance.result_value
+    ).filter(StudentPerformance.sport_type_id == sport_type_id).all()
+
+    changed = []
+    for row in rows:
+        result_value = normalize_result(row.time_result, row.original_result, scoring)
+        if result_value != row.result_value:
+            changed.append({"id": row.id, "result_value": result_value})
+
+    if changed:
+        db.execute(update(StudentPerformance), changed)
+
+
+def sync_performers(db: Session, sport_type_id: Optional[int] = None, student_id: Optional[int] = None) -> int:
+    """
+    Обновить faculty_id и gender выступлений по текущим данным студентов
+    (только отличающиеся строки) и вернуть число обновленных выступлений.
+    """
+    performers = select(
+        Student.id,
+        Student.gender,
+        Group.faculty_id
+    ).outerjoin(Group, Student.group_id == Group.id)
+    if student_id is not None:
+        performers = performers.where(Student.id == student_id)
+    performers = performers.subquery()
+
+    stmt = update(StudentPerformance).where(
+        StudentPerformance.student_id == performers.c.id,
+        or_(
+            StudentPerformance.faculty_id.is_distinct_from(performers.c.faculty_id),
+            StudentPerformance.gender.is_distinct_from(performers.c.gender)
+        )
+    ).values(
+        faculty_id=performers.c.faculty_id,
+        gender=performers.c.gender
+    ).execution_options(synchronize_session=False)
+    if sport_type_id is not None:
+        stmt = stmt.where(StudentPerformance.sport_type_id == sport_type_id)
+    return db.execute(stmt).rowcount
+
+
+def score_sport(db: Session, sport_type_id: int, scoring) -> Dict[int, float]:
+    """
+    Полный пересчет мест и баллов вида спорта для обоих полов одним запросом
+    и одним вызовом rank_places. Возвращает баллы изменившихся выступлений.
+    """
+    rows = db.query(
+        StudentPerformance.id,
+        StudentPerformance.result_value,
+        StudentPerformance.points,
+        StudentPerformance.gender,
+        StudentPerformance.faculty_id
+    ).filter(
+        StudentPerformance.sport_type_id == sport_type_id,
+        StudentPerformance.faculty_id.isnot(None)  # Студенты без группы не участвуют в зачете
+    ).all()
+
+    if scoring.is_team:
+        # Позиция - команда факультета внутри пола, ранжируется по первому по id участнику
+        teams: Dict[tuple, list] = {}
+        for row in rows:
+            teams.setdefault((row.gender, row.faculty_id), []).append(row)
+        units = list(teams.values())
+        firsts = [min(members, key=lambda row: row.id) for members in units]
+        shared = False
+    else:
+        units = [[row] for row in rows]
+        firsts = rows
+        shared = True
+
+    places = rank_places(
+        [rank_key(row.result_value) for row in firsts],
+        [row.gender for row in firsts],
+        [row.id for row in firsts],
+        shared=shared,
+        tolerance=scoring.tie_tolerance
+    )
+
+    changed = {}
+    for members, points in zip(units, points_for_places(places, scoring.points_table)):
+        for row in members:
+            if row.points != points:
+                changed[row.id] = points
+    return changed
+
+
+def scoring_window(fetch, scoring, new_key=None) -> list:
+    """
+    Зачетная зона таблицы индивидуального вида спорта: первые строки по порядку мест.
+
+    fetch(offset, limit) читает отсортированные строки (с полем result_value).
+    Места ниже таблицы баллов получают одинаковые баллы, поэтому вставка или
+    удаление меняет баллы только в первых last_scoring_place + 1 строках и в
+    связанной с ними полосе равных результатов. Окно дочитывается, пока граница
+    делит место со следующей строкой, в том числе через вставляемый результат new_key.
+    """
+    size = scoring.last_scoring_place + 1
+    rows = fetch(0, size + 1)
+    end = min(size, len(rows))
+    while end < len(rows):
+        previous = rank_key(rows[end - 1].result_value)
+        following = rank_key(rows[end].result_value)
+        if new_key is not None and previous <= new_key < following:
+            previous = new_key  # Вставляемый результат встанет на границу окна
+        if not same_place(previous, following, scoring.tie_tolerance):
+            break
+        end += 1
+        if end == len(rows):
+            rows.extend(fetch(end, size))
+    return rows[:end]
+
+
+def load_ranking_board(db: Session, sport_type_id: int, gender, scoring, new_key=None):
+    """
+    Загрузить таблицу вида спорта для одного пола из student_performances.
+
+    Индивидуальные виды читают только зачетную зону (scoring_window): стоимость
+    записи не зависит от размера протокола. Командные виды читаются целиком: место
+    команды определяется ее первым по id участником, а команд не больше, чем факультетов.
+    new_key - ключ результата, который будет вставлен в таблицу.
+    """
+    query = db.query(
+        StudentPerformance.id,
+        StudentPerformance.result_value,
+        StudentPerformance.points,
+        StudentPerformance.faculty_id
+    ).filter(
+        StudentPerformance.sport_type_id == sport_type_id,
+        StudentPerformance.gender == gender,
+        StudentPerformance.faculty_id.isnot(None)
+    ).order_by(
+        StudentPerformance.result_value.asc().nullslast(),
+        StudentPerformance.id
+    )
+    if scoring.is_team:
+        rows = query.all()
+    else:
+        rows = scoring_window(lambda offset, limit: query.offset(offset).limit(limit).all(), scoring, new_key)
+
+    board = RankingBoard(scoring)
+    for row in rows:
+        board.load(row.id, row.faculty_id, rank_key(row.result_value), row.points)
+    board.build()
+    return board
+
+
+def apply_points(db: Session, changed: Dict[int, float]):
+    """Записать баллы только для изменившихся выступлений одним пакетным UPDATE"""
+    if changed:
+        rows_reranked.inc(len(changed))
+        db.execute(
+            update(StudentPerformance),
+            [{"id": performance_id, "points": points} for performance_id, points in changed.items()]
+        )
@@ -0,0 +1,109 @@
+# backend/app/utils/read_routing.py - выбор реплики или основной базы для чтения
+import threading
+import time
+from typing import Dict, Optional
+
+from http.cookies import SimpleCookie
+
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Cookie, по которой клиент, только что записавший данные, читает их с основной базы
+LAST_WRITE_COOKIE = "spartakiada_last_write"
+
+# Как часто перепроверять отставание реплики, секунды
+REPLICA_LAG_CHECK_INTERVAL = 1.0
+
+# Отставание реплики: 0, если все полученное WAL уже применено
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReadRouting:
+    """
+    Политика чтения с реплики.
+
+    Клиент, записавший данные не более write_window секунд назад (по cookie
+    или по адресу в этом процессе), читает с основной базы и видит свою
+    запись. Если реплика отстает больше max_lag секунд, все чтения идут на
+    основную базу.
+    """
+
+    def __init__(self, enabled: bool, write_window: float, max_lag: float):
+        self.enabled = enabled
+        self.write_window = write_window
+        self.max_lag = max_lag
+        self._lock = threading.Lock()
+        self._writers: Dict[str, float] = {}  # адрес клиента -> время последней записи
+        self._last_write = 0.0
+        self._lag_checked_at = 0.0
+        self._replica_fresh = True
+
+    def mark_write(self, client_host: Optional[str]) -> str:
+        """Запомнить запись клиента и вернуть значение заголовка Set-Cookie"""
+        now = time.time()
+        with self._lock:
+            self._last_write = now
+            if client_host:
+                self._writers[client_host] = now
+            # Старые отметки не нужны: чистим, чтобы словарь не рос
+            if len(self._writers) > 1000:
+                self._writers = {
+                    host: at for host, at in self._writers.items() if now - at < self.write_window
+                }
+        cookie = SimpleCookie()
+        cookie[LAST_WRITE_COOKIE] = str(now)
+        cookie[LAST_WRITE_COOKIE]["max-age"] = max(1, int(self.write_window))
+        cookie[LAST_WRITE_COOKIE]["path"] = "/"
+        cookie[LAST_WRITE_COOKIE]["httponly"] = True
+        cookie[LAST_WRITE_COOKIE]["samesite"] = "lax"
+        return cookie.output(header="").strip()
+
+    def recent_writer(self, request: Request) -> bool:
+        if LAST_WRITE_COOKIE in request.cookies:
+            return True
+        written_at: Optional[float] = self._writers.get(request.client.host) if request.client else None
+        return written_at is not None and time.time() - written_at < self.write_window
+
+    def replica_may_lag(self) -> bool:
+        """Могла ли реплика еще не получить запись этого процесса (для общих кэшей)"""
+        return self.enabled and time.time() - self._last_write < self.write_window
+
+    async def replica_fresh(self, replica: AsyncEngine) -> bool:
+        now = time.monotonic()
+        if now - self._lag_checked_at >= REPLICA_LAG_CHECK_INTERVAL:
+            self._lag_checked_at = now
+            try:
+                async with replica.connect() as connection:
+                    lag = (await connection.execute(REPLICA_LAG_SQL)).scalar() or 0
+                self._replica_fresh = float(lag) <= self.max_lag
+            except Exception:
+                self._replica_fresh = False
+        return self._replica_fresh
+
+
+class ReadYourWritesMiddleware:
+    """ASGI-middleware: отмечает успешные изменяющие запросы для политики чтения с реплики"""
+
+    WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+    def __init__(self, app, routing: ReadRouting):
+        self.app = app
+        self.routing = routing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.routing.enabled or scope["method"] not in self.WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_mark(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                client = scope.get("client")
+                cookie = self.routing.mark_write(client[0] if client else None)
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_mark)
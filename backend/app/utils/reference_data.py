@@ -0,0 +1,89 @@
+# backend/app/utils/reference_data.py - справочники в памяти процесса
+import time
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from ..config import settings
+from ..models import SportType, Faculty, Group
+from ..schemas import SportTypeRead, FacultyRead, GroupRead
+
+# Ключ Session.info: в транзакции изменялись справочники
+REFERENCE_DATA_CHANGED_KEY = "reference_data_changed"
+
+
+class ReferenceData:
+    """
+    Виды спорта, факультеты и группы в памяти процесса.
+
+    Загружаются при старте приложения. Изменение справочника в этом процессе
+    помечает данные устаревшими после коммита, TTL ограничивает устаревание при изменениях
+    в других воркерах; перезагрузка идет при следующем обращении.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._loaded_at: Optional[float] = None
+        self._generation = 0  # Увеличивается при каждом сбросе
+        self.sport_types: List[dict] = []
+        self.faculties: List[dict] = []
+        self.groups: List[dict] = []  # Отсортированы по (номер, id), как список групп
+
+    def load(self, db: Session):
+        generation = self._generation
+        self.sport_types = [
+            SportTypeRead.model_validate(sport_type).model_dump(mode="json")
+            for sport_type in db.query(SportType).order_by(SportType.id)
+        ]
+        self.faculties = [
+            FacultyRead.model_validate(faculty).model_dump(mode="json")
+            for faculty in db.query(Faculty).order_by(Faculty.id)
+        ]
+        self.groups = [
+            GroupRead.model_validate(group).model_dump(mode="json")
+            for group in db.query(Group).order_by(Group.number, Group.id)
+        ]
+        # Сброс во время чтения: снимок мог не увидеть изменение, он перечитается при следующем обращении
+        self._loaded_at = time.monotonic() if generation == self._generation else None
+
+    def invalidate(self):
+        self._generation += 1
+        self._loaded_at = None
+
+    async def fresh(self, db: AsyncSession) -> "ReferenceData":
+        """Справочники, при необходимости перезагруженные через переданную сессию"""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl_seconds:
+            await db.run_sync(self.load)
+        return self
+
+
+reference_data = ReferenceData(settings.REFERENCE_DATA_TTL_SECONDS)
+
+
+@event.listens_for(SportType, "after_insert")
+@event.listens_for(SportType, "after_update")
+@event.listens_for(SportType, "after_delete")
+@event.listens_for(Faculty, "after_insert")
+@event.listens_for(Faculty, "after_update")
+@event.listens_for(Faculty, "after_delete")
+@event.listens_for(Group, "after_insert")
+@event.listens_for(Group, "after_update")
+@event.listens_for(Group, "after_delete")
+def _remember_changed_reference_data(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info[REFERENCE_DATA_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_reference_data(session):
+    # После коммита: перезагрузка в другой сессии не закэширует снимок без изменений
+    if session.info.pop(REFERENCE_DATA_CHANGED_KEY, False):
+        reference_data.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_reference_data(session):
+    session.info.pop(REFERENCE_DATA_CHANGED_KEY, None)
@@ -5,20 +5,7 @@ from sqlalchemy import text
 from ..database import SessionLocal, engine, Base
 from ..models import *
 from ..api.auth import get_password_hash
-
-
-def get_points_for_place(place):
-    """Получить баллы за место согласно правилам спартакиады"""
-    if place <= 10:
-        return 11 - place  # 1 место = 10 баллов, 2 место = 9 баллов, ..., 10 место = 1 балл
-    else:
-        return 1  # 11+ места = 1 балл
-
-
-def is_team_sport(sport_name):
-    """Определить, является ли вид спорта командным"""
-    team_sports = ['Баскетбол', 'Волейбол', 'Футбол']
-    return any(sport in sport_name for sport in team_sports)
+from .sport_registry import get_points_for_place
 
 
 def generate_realistic_result(sport_name, gender, is_good_athlete=False):
@@ -73,6 +60,7 @@ def seed_database():
         # Сначала удаляем данные из таблиц, которые ссылаются на другие таблицы
         db.query(StudentPerformance).delete()
         db.query(FacultyCompetitionResult).delete()
+        db.query(FacultyStanding).delete()
         db.query(FacultyTotalPoints).delete()
 
         # Очищаем связующие таблицы many-to-many напрямую
@@ -133,14 +121,14 @@ def seed_database():
         # Create sport types
         print("Создание видов спорта...")
         sport_types = [
-            SportType(name="Бег 100м"),
-            SportType(name="Бег 1000м"),
-            SportType(name="Плавание"),
-            SportType(name="Баскетбол"),
-            SportType(name="Волейбол"),
-            SportType(name="Футбол"),
-            SportType(name="Шахматы"),
-            SportType(name="Настольный теннис"),
+            SportType(name="Бег 100м", is_team=False, lower_is_better=True, tie_tolerance=0.01),
+            SportType(name="Бег 1000м", is_team=False, lower_is_better=True, tie_tolerance=0.01),
+            SportType(name="Плавание", is_team=False, lower_is_better=True, tie_tolerance=0.01),
+            SportType(name="Баскетбол", is_team=True, lower_is_better=False),
+            SportType(name="Волейбол", is_team=True, lower_is_better=False),
+            SportType(name="Футбол", is_team=True, lower_is_better=False),
+            SportType(name="Шахматы", is_team=False, lower_is_better=False),
+            SportType(name="Настольный теннис", is_team=False, lower_is_better=False),
         ]
         for sport_type in sport_types:
             db.add(sport_type)
@@ -255,7 +243,7 @@ def seed_database():
             female_students = [s for s in faculty_students if s.gender.value == "Ж"]
 
             for sport_type in sport_types:
-                if is_team_sport(sport_type.name):
+                if sport_type.is_team:
                     # Создаем мужскую команду
                     male_team = Team(
                         sport_type_id=sport_type.id,
@@ -303,7 +291,7 @@ def seed_database():
             db.add(competition)
             db.commit()
 
-            if is_team_sport(sport_type.name):
+            if sport_type.is_team:
                 sport_teams = [t for t in teams if t.sport_type_id == sport_type.id]
                 for team in sport_teams:
                     competition.teams.append(team)
@@ -316,7 +304,7 @@ def seed_database():
         for competition in competitions:
             sport_type = competition.sport_type
 
-            if is_team_sport(sport_type.name):
+            if sport_type.is_team:
                 # КОМАНДНЫЕ ВИДЫ СПОРТА - разделенные по полу
                 for team in competition.teams:
                     # Определяем пол команды по первому участнику
@@ -338,7 +326,9 @@ def seed_database():
                             judge_id=random.choice(judges).id,
                             points=0,  # Будет пересчитано автоматически
                             time_result=time_result,
-                            original_result=sort_value
+                            original_result=sort_value,
+                            faculty_id=student.group.faculty_id,
+                            gender=student.gender
                         )
                         db.add(performance)
 
@@ -376,7 +366,9 @@ def seed_database():
                         judge_id=random.choice(judges).id,
                         points=0,  # Будет пересчитано автоматически
                         time_result=time_result,
-                        original_result=sort_value
+                        original_result=sort_value,
+                        faculty_id=student.group.faculty_id,
+                        gender=student.gender
                     )
                     db.add(performance)
 
@@ -397,7 +389,9 @@ def seed_database():
                         judge_id=random.choice(judges).id,
                         points=0,  # Будет пересчитано автоматически
                         time_result=time_result,
-                        original_result=sort_value
+                        original_result=sort_value,
+                        faculty_id=student.group.faculty_id,
+                        gender=student.gender
                     )
                     db.add(performance)
 
@@ -412,6 +406,7 @@ def seed_database():
 
         # Обновляем результаты факультетов
         update_faculty_results_all(db)
+        db.commit()
 
         print("База данных успешно заполнена с раздельным подсчетом баллов по полу!")
         print(f"Создано:")
@@ -0,0 +1,135 @@
+# backend/app/utils/sport_registry.py - правила подсчета видов спорта
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from ..config import settings
+from ..models import SportType
+
+# Ключ Session.info: в транзакции изменялись виды спорта
+SPORTS_CHANGED_KEY = "sport_registry_changed"
+
+# 1 место = 10 баллов, 2 место = 9 баллов, ..., 10 место и ниже = 1 балл
+DEFAULT_POINTS_TABLE = (10, 9, 8, 7, 6, 5, 4, 3, 2, 1)
+
+
+def get_points_for_place(place, points_table=DEFAULT_POINTS_TABLE):
+    """Получить баллы за место согласно правилам спартакиады"""
+    # Места ниже таблицы получают баллы последнего места таблицы
+    return points_table[min(place, len(points_table)) - 1]
+
+
+def is_team_sport(sport_name):
+    """Определить по названию, является ли вид спорта командным (для видов спорта без метаданных)"""
+    team_sports = ['Баскетбол', 'Волейбол', 'Футбол']
+    return any(sport in sport_name for sport in team_sports)
+
+
+def is_time_based_sport(sport_name):
+    """Определить по названию, оценивается ли вид спорта по времени (для видов спорта без метаданных)"""
+    return any(word in sport_name.lower() for word in ['бег', 'плавание'])
+
+
+@dataclass(frozen=True)
+class SportScoring:
+    """Правила подсчета одного вида спорта"""
+    sport_type_id: int
+    name: str
+    is_team: bool
+    lower_is_better: bool  # True - время и подобные результаты, False - очки
+    tie_tolerance: float = 0.0  # Допуск: соседние в протоколе результаты, отличающиеся не больше, делят место
+    points_table: Tuple[float, ...] = DEFAULT_POINTS_TABLE
+
+    @property
+    def last_scoring_place(self):
+        """Начиная с этого места баллы больше не меняются"""
+        return len(self.points_table)
+
+    def points_for_place(self, place):
+        return get_points_for_place(place, self.points_table)
+
+    @classmethod
+    def from_model(cls, sport_type: SportType) -> "SportScoring":
+        # Для видов спорта, созданных до появления метаданных, правила берутся из названия
+        is_team = sport_type.is_team
+        if is_team is None:
+            is_team = is_team_sport(sport_type.name)
+        lower_is_better = sport_type.lower_is_better
+        if lower_is_better is None:
+            lower_is_better = is_time_based_sport(sport_type.name)
+
+        return cls(
+            sport_type_id=sport_type.id,
+            name=sport_type.name,
+            is_team=is_team,
+            lower_is_better=lower_is_better,
+            tie_tolerance=sport_type.tie_tolerance or 0.0,
+            points_table=tuple(sport_type.points_table or DEFAULT_POINTS_TABLE)
+        )
+
+
+class SportRegistry:
+    """
+    Неизменяемый реестр правил подсчета, загружаемый при старте приложения.
+    Вид спорта, появившийся после загрузки, читается из базы при первом обращении.
+
+    Изменение видов спорта в этом процессе сбрасывает реестр после коммита,
+    TTL ограничивает устаревание правил при изменениях в других воркерах;
+    перезагрузка идет при следующем обращении.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._loaded_at: Optional[float] = None
+        self._sports: Mapping[int, SportScoring] = MappingProxyType({})
+
+    def load(self, db: Session):
+        """Загрузить (или перезагрузить) правила всех видов спорта"""
+        self._sports = MappingProxyType({
+            sport_type.id: SportScoring.from_model(sport_type)
+            for sport_type in db.query(SportType).all()
+        })
+        self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def get(self, db: Session, sport_type_id: int) -> Optional[SportScoring]:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl_seconds:
+            self.load(db)
+        scoring = self._sports.get(sport_type_id)
+        if scoring is None:
+            sport_type = db.query(SportType).filter(SportType.id == sport_type_id).first()
+            if not sport_type:
+                return None
+            scoring = SportScoring.from_model(sport_type)
+            # Реестр не меняется на месте: подменяется целиком
+            self._sports = MappingProxyType({**self._sports, sport_type_id: scoring})
+        return scoring
+
+
+sport_registry = SportRegistry(settings.SPORT_REGISTRY_TTL_SECONDS)
+
+
+@event.listens_for(SportType, "after_insert")
+@event.listens_for(SportType, "after_update")
+@event.listens_for(SportType, "after_delete")
+def _remember_changed_sports(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info[SPORTS_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_sports(session):
+    if session.info.pop(SPORTS_CHANGED_KEY, False):
+        sport_registry.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_sports(session):
+    session.info.pop(SPORTS_CHANGED_KEY, None)
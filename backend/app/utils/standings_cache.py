@@ -0,0 +1,126 @@
+# backend/app/utils/standings_cache.py - кэш протоколов и рейтингов в памяти процесса
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, NamedTuple, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from ..config import settings
+from ..database import read_routing
+from .metrics import standings_cache_requests
+
+
+class CachedStandings(NamedTuple):
+    version: int
+    expires_at: float
+    etag: str
+    body: bytes
+
+
+class StandingsCache:
+    """
+    Кэш готовых JSON-ответов протоколов и рейтингов.
+
+    У каждого вида спорта своя версия, у общего зачета (None) - своя. Запись
+    результата повышает версию вида спорта и общего зачета, после чего старые
+    записи кэша перестают выдаваться. TTL ограничивает устаревание данных,
+    записанных другим процессом (воркером) uvicorn. Число записей ограничено
+    (LRU), просроченные записи вычищаются при добавлении новых.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._reset = 0  # Версия последнего сброса всех видов спорта
+        self._versions: Dict[Optional[int], int] = {}
+        self._entries: "OrderedDict[Hashable, CachedStandings]" = OrderedDict()
+
+    def version(self, sport_type_id: Optional[int] = None) -> int:
+        return max(self._versions.get(sport_type_id, 0), self._reset)
+
+    def bump(self, sport_type_id: Optional[int] = None):
+        """Отметить изменение результатов вида спорта (None - всех видов спорта)"""
+        with self._lock:
+            self._counter += 1
+            if sport_type_id is None:
+                self._reset = self._counter
+            else:
+                self._versions[sport_type_id] = self._counter
+            self._versions[None] = self._counter
+
+    def get(self, key: Hashable, sport_type_id: Optional[int]) -> Optional[CachedStandings]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.version != self.version(sport_type_id) or entry.expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def entry(self, version: int, body: bytes) -> CachedStandings:
+        return CachedStandings(
+            version=version,
+            expires_at=time.monotonic() + self.ttl_seconds,
+            etag='"%s"' % hashlib.sha1(body).hexdigest()[:20],
+            body=body
+        )
+
+    def put(self, key: Hashable, version: int, body: bytes) -> CachedStandings:
+        entry = self.entry(version, body)
+        now = time.monotonic()
+        with self._lock:
+            for expired in [k for k, cached in self._entries.items() if cached.expires_at < now]:
+                del self._entries[expired]
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Проверить заголовок If-None-Match (в том числе список и слабые ETag)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+standings_cache = StandingsCache(settings.STANDINGS_CACHE_TTL_SECONDS, settings.STANDINGS_CACHE_SIZE)
+
+
+async def cached_standings_response(
+        request: Request,
+        key: Hashable,
+        sport_type_id: Optional[int],
+        build: Callable[[], Awaitable[object]]
+) -> Response:
+    """
+    Отдать ответ из кэша или построить его через await build().
+    Совпадение ETag дает 304 Not Modified без обращения к базе данных.
+    """
+    entry = standings_cache.get(key, sport_type_id)
+    standings_cache_requests.inc(result="miss" if entry is None else "hit")
+    if entry is None:
+        # Версия фиксируется до чтения, чтобы параллельная запись не попала в кэш под старой версией
+        version = standings_cache.version(sport_type_id)
+        body = JSONResponse(content=jsonable_encoder(await build())).body
+        if read_routing.replica_may_lag():
+            # Ответ мог быть построен по реплике, еще не получившей запись: в кэш не кладем
+            entry = standings_cache.entry(version, body)
+        else:
+            entry = standings_cache.put(key, version, body)
+
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
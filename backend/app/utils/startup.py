@@ -0,0 +1,103 @@
+# backend/app/utils/startup.py - прогрев приложения после старта
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy.exc import DBAPIError, ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+from starlette.concurrency import run_in_threadpool
+
+from ..config import settings
+from ..database import Base, SessionLocal, async_engine, engine, read_async_engine
+from .reference_data import reference_data
+from .sport_registry import sport_registry
+from .student_search import detect_trigram_search
+
+logger = logging.getLogger(__name__)
+
+
+class StartupState:
+    """Готовность приложения к приему запросов (для /health)"""
+
+    def __init__(self):
+        self.ready = False
+        self.attempts = 0
+        self.warmup_seconds: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+
+startup_state = StartupState()
+
+
+def warm_pool_size(pool) -> int:
+    # Без собственного пула (PgBouncer) достаточно проверить одно соединение
+    return pool.size() if isinstance(pool, QueuePool) else 1
+
+
+def prepare_database():
+    """Синхронная часть прогрева: схема (по настройке), пул, справочники, проверка индексов поиска"""
+    if settings.DB_CREATE_SCHEMA_ON_STARTUP:
+        Base.metadata.create_all(bind=engine)
+
+    connections = []
+    try:
+        for _ in range(warm_pool_size(engine.pool)):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+
+    with SessionLocal() as db:
+        sport_registry.load(db)
+        reference_data.load(db)
+
+    detect_trigram_search(engine)
+
+
+async def warm_async_pool(pool_engine: AsyncEngine):
+    """Открыть соединения асинхронного пула одновременно и вернуть их в пул"""
+    connections = [pool_engine.connect() for _ in range(warm_pool_size(pool_engine.pool))]
+    started = await asyncio.gather(*(connection.start() for connection in connections), return_exceptions=True)
+    await asyncio.gather(*(
+        connection.close()
+        for connection, result in zip(connections, started) if not isinstance(result, BaseException)
+    ))
+    for result in started:
+        if isinstance(result, BaseException):
+            raise result
+
+
+async def warm_up():
+    """
+    Подготовить приложение к запросам. Пока прогрев не закончен, /health
+    отвечает 503; если база недоступна, попытки повторяются.
+    """
+    started = time.perf_counter()
+    engines = [async_engine] if read_async_engine is async_engine else [async_engine, read_async_engine]
+    while True:
+        startup_state.attempts += 1
+        try:
+            await run_in_threadpool(prepare_database)
+            await asyncio.gather(*(warm_async_pool(pool_engine) for pool_engine in engines))
+            break
+        except ProgrammingError as exc:
+            # Нет таблиц или столбцов: повторы ждут миграций, а не доступности базы
+            logger.error(
+                f"Warmup attempt {startup_state.attempts} failed, database schema is missing or outdated "
+                f"(run alembic upgrade head or set DB_CREATE_SCHEMA_ON_STARTUP=true): {exc.orig}"
+            )
+            await asyncio.sleep(settings.STARTUP_RETRY_SECONDS)
+        except (DBAPIError, OSError) as exc:
+            logger.warning(f"Warmup attempt {startup_state.attempts} failed: {exc}")
+            await asyncio.sleep(settings.STARTUP_RETRY_SECONDS)
+
+    startup_state.warmup_seconds = round(time.perf_counter() - started, 3)
+    startup_state.ready = True
+    logger.info(f"Warmup finished in {startup_state.warmup_seconds} s")
+
+
+def start_warmup():
+    """Запустить прогрев в фоне: сервер начинает принимать соединения сразу"""
+    startup_state.task = asyncio.create_task(warm_up())
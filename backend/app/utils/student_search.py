@@ -0,0 +1,205 @@
+# backend/app/utils/student_search.py - поиск студентов по ФИО
+import logging
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Select, and_, event, func, literal, or_, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from ..config import settings
+from ..models import Student
+
+# Сколько результатов поиска возвращать по умолчанию
+SEARCH_LIMIT = 20
+
+# Учитываются только первые слова запроса (фамилия, имя, отчество)
+MAX_SEARCH_TOKENS = 3
+
+# Сколько найденных по индексу в памяти id проверять фильтрами запроса за раз
+SEARCH_BATCH_SIZE = 200
+
+# Ключ Session.info: в транзакции изменялись студенты
+STUDENTS_CHANGED_KEY = "student_name_index_changed"
+
+# Поиск по части ФИО (ILIKE '%...%') через триграммы pg_trgm; создаются миграцией 0007
+TRIGRAM_INDEXES = {
+    "ix_students_last_name_trgm": "last_name",
+    "ix_students_first_name_trgm": "first_name",
+    "ix_students_middle_name_trgm": "middle_name",
+}
+
+logger = logging.getLogger(__name__)
+
+# Включается при старте, если в базе есть pg_trgm и все индексы триграмм
+trigram_search_enabled = False
+
+
+def detect_trigram_search(engine: Engine):
+    """
+    Проверить, что расширение pg_trgm и GIN-индексы по ФИО созданы (и достроены).
+    Без них (или не в PostgreSQL) поиск работает через StudentNameIndex.
+    """
+    global trigram_search_enabled
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.connect() as connection:
+        has_extension = connection.execute(text(
+            "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+        )).first() is not None
+        valid_indexes = connection.execute(text(
+            "SELECT count(*) FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = ANY(:names) AND i.indisvalid"
+        ), {"names": list(TRIGRAM_INDEXES)}).scalar()
+    trigram_search_enabled = has_extension and valid_indexes == len(TRIGRAM_INDEXES)
+    if not trigram_search_enabled:
+        logger.warning("Индексы pg_trgm не найдены (alembic upgrade head), поиск студентов идет по индексу в памяти")
+
+
+def search_tokens(search: str) -> List[str]:
+    return search.lower().split()[:MAX_SEARCH_TOKENS]
+
+
+def escape_like(value: str) -> str:
+    return value.replace("/", "//").replace("%", "/%").replace("_", "/_")
+
+
+class StudentNameIndex:
+    """
+    Префиксный индекс фамилий и имен в памяти процесса.
+
+    Используется вместо pg_trgm, когда база не PostgreSQL (например, SQLite
+    в тестах) или расширение недоступно. Строится при первом поиске и
+    перестраивается после коммита, изменившего студентов в этом процессе;
+    TTL ограничивает устаревание при изменениях в других воркерах. Работает
+    в цикле событий: параллельное построение безопасно, последнее просто
+    заменит результат предыдущего.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._dirty = True
+        self._built_at: Optional[float] = None
+        self._tokens: List[Tuple[str, int]] = []  # Отсортированные пары (слово, id студента)
+        self._names: Dict[int, Tuple[str, str]] = {}  # id студента -> (фамилия, имя)
+
+    def invalidate(self):
+        self._dirty = True
+
+    async def _build(self, db: AsyncSession):
+        tokens = []
+        names = {}
+        for student_id, last_name, first_name, middle_name in await db.execute(
+                select(Student.id, Student.last_name, Student.first_name, Student.middle_name)
+        ):
+            names[student_id] = (last_name.lower(), first_name.lower())
+            for name in (last_name, first_name, middle_name):
+                if name:
+                    tokens.append((name.lower(), student_id))
+        tokens.sort()
+        self._tokens, self._names = tokens, names
+
+    @staticmethod
+    def _prefix_ids(tokens: List[Tuple[str, int]], prefix: str) -> set:
+        ids = set()
+        for index in range(bisect_left(tokens, (prefix,)), len(tokens)):
+            token, student_id = tokens[index]
+            if not token.startswith(prefix):
+                break
+            ids.add(student_id)
+        return ids
+
+    async def search(self, db: AsyncSession, tokens: List[str]) -> List[int]:
+        """id студентов, у которых каждое слово запроса - начало фамилии, имени или отчества"""
+        if self._dirty or time.monotonic() - self._built_at > self.ttl_seconds:
+            # Флаг сбрасывается до чтения, чтобы изменение во время построения не потерялось
+            self._dirty = False
+            self._built_at = time.monotonic()
+            await self._build(db)
+        index, names = self._tokens, self._names
+
+        ids = None
+        for token in tokens:
+            matched = self._prefix_ids(index, token)
+            ids = matched if ids is None else ids & matched
+        if not ids:
+            return []
+
+        def rank(student_id):
+            last_name, first_name = names[student_id]
+            # Сначала точные совпадения слов, затем по алфавиту
+            exact = sum(token in (last_name, first_name) for token in tokens)
+            return -exact, last_name, first_name, student_id
+
+        return sorted(ids, key=rank)
+
+
+student_name_index = StudentNameIndex(settings.STUDENT_NAME_INDEX_TTL_SECONDS)
+
+
+@event.listens_for(Student, "after_insert")
+@event.listens_for(Student, "after_update")
+@event.listens_for(Student, "after_delete")
+def _remember_changed_students(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info[STUDENTS_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_name_index(session):
+    # После коммита: построение в другой сессии не закэширует снимок без новых студентов
+    if session.info.pop(STUDENTS_CHANGED_KEY, False):
+        student_name_index.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_students(session):
+    session.info.pop(STUDENTS_CHANGED_KEY, None)
+
+
+async def search_students(db: AsyncSession, query: Select, search: str, limit: int = SEARCH_LIMIT) -> List[Student]:
+    """
+    Найти студентов по началу или части фамилии, имени, отчества.
+    query - запрос студентов с уже наложенными фильтрами; результат ранжирован.
+
+    С pg_trgm условие ILIKE '%слово%' обслуживается GIN-индексами, а ранг -
+    word_similarity. Иначе используется StudentNameIndex.
+    """
+    tokens = search_tokens(search)
+    if not tokens:
+        return []
+
+    if trigram_search_enabled:
+        conditions = []
+        rank = literal(0.0)
+        for token in tokens:
+            pattern = f"%{escape_like(token)}%"
+            conditions.append(or_(
+                Student.last_name.ilike(pattern, escape="/"),
+                Student.first_name.ilike(pattern, escape="/"),
+                Student.middle_name.ilike(pattern, escape="/")
+            ))
+            rank = rank + func.greatest(
+                func.word_similarity(token, Student.last_name),
+                func.word_similarity(token, Student.first_name)
+            )
+        return (await db.scalars(
+            query.where(and_(*conditions))
+            .order_by(rank.desc(), Student.last_name, Student.id)
+            .limit(limit)
+        )).all()
+
+    # Лучшие по рангу id проверяются фильтрами запроса порциями, пока не наберется limit
+    ranked_ids = await student_name_index.search(db, tokens)
+    found = []
+    for start in range(0, len(ranked_ids), SEARCH_BATCH_SIZE):
+        batch = ranked_ids[start:start + SEARCH_BATCH_SIZE]
+        position = {student_id: index for index, student_id in enumerate(batch)}
+        students = (await db.scalars(query.where(Student.id.in_(batch)))).all()
+        found.extend(sorted(students, key=lambda student: position[student.id]))
+        if len(found) >= limit:
+            break
+    return found[:limit]
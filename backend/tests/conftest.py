@@ -0,0 +1,29 @@
+# backend/tests/conftest.py - общие настройки тестов
+import os
+import tempfile
+
+import pytest
+
+# Данные тестовой базы удаляются при заполнении: TEST_DATABASE_URL - отдельная база
+# (PostgreSQL), без него тесты идут на временной базе SQLite
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL") or "sqlite:///" + os.path.join(
+    tempfile.mkdtemp(prefix="spartakiada-tests-"), "test.db"
+)
+# Настройки читаются при импорте приложения
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ.pop("READ_DATABASE_URL", None)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Клиент приложения после прогрева"""
+    from fastapi.testclient import TestClient
+
+    from app.bench.suite import wait_until_ready
+    from app.database import Base, engine
+    from app.main import app
+
+    Base.metadata.create_all(bind=engine)
+    with TestClient(app) as test_client:
+        wait_until_ready()
+        yield test_client
@@ -0,0 +1,209 @@
+# backend/tests/test_ranking.py - свойства ядра ранжирования
+import random
+from collections import namedtuple
+
+import pytest
+
+from app.models.student import Gender
+from app.utils import ranking
+from app.utils.ranking import (
+    RankingBoard, normalize_result, points_for_places, rank_key, rank_places, score_sport, scoring_window
+)
+from app.utils.sport_registry import DEFAULT_POINTS_TABLE, SportScoring
+
+SEEDS = range(50)
+
+# Мало различных значений, чтобы чаще встречались равные результаты; None - нет результата
+RESULT_VALUES = (None, -99.0, -70.0, -60.0, -50.0, 11.0, 12.5, 13.0, 13.01, 14.25)
+
+Row = namedtuple("Row", "id result_value points gender faculty_id")
+
+
+@pytest.fixture(params=["numpy", "python"])
+def kernel(request, monkeypatch):
+    """Прогнать тест и на NumPy, и на чистом Python"""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+        assert ranking.np is not None
+    else:
+        monkeypatch.setattr(ranking, "np", None)
+    return request.param
+
+
+def random_columns(rng, size):
+    values = [rank_key(rng.choice(RESULT_VALUES + (round(rng.uniform(10, 11), 2),))) for _ in range(size)]
+    groups = [rng.choice(list(Gender)) for _ in range(size)]
+    order = rng.sample(range(size * 10), size)
+    return values, groups, order
+
+
+def both_kernels(monkeypatch, function, *args, **kwargs):
+    """Результат функции с NumPy и без него"""
+    with_numpy = function(*args, **kwargs)
+    monkeypatch.setattr(ranking, "np", None)
+    without_numpy = function(*args, **kwargs)
+    monkeypatch.undo()
+    return with_numpy, without_numpy
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("shared", [True, False])
+@pytest.mark.parametrize("tolerance", [0.0, 0.01, 0.5])
+def test_rank_places_numpy_matches_fallback(monkeypatch, seed, shared, tolerance):
+    pytest.importorskip("numpy")
+    rng = random.Random(seed)
+    values, groups, order = random_columns(rng, rng.randint(0, 60))
+
+    with_numpy, without_numpy = both_kernels(
+        monkeypatch, rank_places, values, groups, order, shared=shared, tolerance=tolerance
+    )
+    assert with_numpy == without_numpy
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_points_for_places_numpy_matches_fallback(monkeypatch, seed):
+    pytest.importorskip("numpy")
+    rng = random.Random(seed)
+    places = [rng.randint(1, 30) for _ in range(rng.randint(0, 30))]
+    table = rng.choice([DEFAULT_POINTS_TABLE, (25, 18, 15, 12, 10), (1,)])
+
+    with_numpy, without_numpy = both_kernels(monkeypatch, points_for_places, places, table)
+    assert with_numpy == without_numpy
+
+
+def test_rank_places_tolerance_chains_neighbours(kernel):
+    # Соседние результаты в пределах допуска делят место, даже если крайние отличаются больше
+    assert rank_places([10.0, 10.01, 10.02, 10.5, float("inf"), float("inf")], tolerance=0.01) == [1, 1, 1, 4, 5, 5]
+    assert rank_places([10.0, 10.01, 10.02, 10.5], tolerance=0.0) == [1, 2, 3, 4]
+
+
+def baseline_place_points(place):
+    """Баллы за место, как в исходном подсчете: 11+ места - 1 балл"""
+    return 11 - place if place <= 10 else 1
+
+
+def baseline_points(rows, is_team):
+    """
+    Исходный подсчет: для каждого пола сортировка и проход по протоколу.
+    Индивидуальные виды - равные результаты делят место; командные - команда
+    факультета по результату первого участника, места подряд.
+    """
+    points = {}
+    for gender in Gender:
+        performances = sorted((row for row in rows if row.gender == gender), key=lambda row: row.id)
+        if is_team:
+            faculty_performances = {}
+            for performance in performances:
+                faculty_performances.setdefault(performance.faculty_id, []).append(performance)
+            faculty_results = sorted(
+                faculty_performances.values(), key=lambda perfs: (rank_key(perfs[0].result_value), perfs[0].id)
+            )
+            for place, perfs in enumerate(faculty_results, 1):
+                for performance in perfs:
+                    points[performance.id] = baseline_place_points(place)
+        else:
+            performances.sort(key=lambda row: rank_key(row.result_value))
+            current_place = 1
+            for i, performance in enumerate(performances):
+                if i > 0 and rank_key(performance.result_value) != rank_key(performances[i - 1].result_value):
+                    current_place = i + 1
+                points[performance.id] = baseline_place_points(current_place)
+    return points
+
+
+class FakeQuery:
+    """Запрос score_sport к сессии: фильтры уже учтены в заданных строках"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, *criteria):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def query(self, *columns):
+        return FakeQuery(self.rows)
+
+
+def random_rows(rng, size):
+    ids = rng.sample(range(1, size * 10 + 1), size)
+    return [
+        Row(
+            id=performance_id,
+            result_value=rng.choice(RESULT_VALUES),
+            points=rng.choice((None, 1.0, 5.0, 10.0)),  # Сохраненные баллы, возможно устаревшие
+            gender=rng.choice(list(Gender)),
+            faculty_id=rng.randint(1, 6)
+        )
+        for performance_id in ids
+    ]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("is_team", [False, True])
+def test_score_sport_matches_baseline(kernel, seed, is_team):
+    rng = random.Random(seed)
+    rows = random_rows(rng, rng.randint(0, 80))
+    scoring = SportScoring(sport_type_id=1, name="Вид спорта", is_team=is_team, lower_is_better=False)
+
+    changed = score_sport(FakeSession(rows), 1, scoring)
+
+    expected = baseline_points(rows, is_team)
+    # Возвращаются только изменившиеся баллы
+    assert changed == {row.id: expected[row.id] for row in rows if row.points != expected[row.id]}
+
+
+# Исходные результаты: время (меньше - лучше) и очки, с частыми совпадениями; None - нет результата
+TIME_RESULTS = (None, "0:00:12.50", "0:00:12.75", "0:00:13.00", "12.5", "0:01:02.25")
+ORIGINAL_RESULTS = (None, 50.0, 60.0, 60.25, 70.0)
+
+
+def board_from_rows(rows, gender, scoring, new_key=None):
+    """Таблица одного пола из строк в памяти, как ее загружает load_ranking_board"""
+    table = sorted((row for row in rows if row.gender == gender), key=lambda row: (rank_key(row.result_value), row.id))
+    if not scoring.is_team:
+        table = scoring_window(lambda offset, limit: table[offset:offset + limit], scoring, new_key)
+    board = RankingBoard(scoring)
+    for row in table:
+        board.load(row.id, row.faculty_id, rank_key(row.result_value), row.points)
+    board.build()
+    return board
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("is_team", [False, True])
+@pytest.mark.parametrize("lower_is_better", [False, True])
+@pytest.mark.parametrize("tolerance", [0.0, 0.25])
+@pytest.mark.parametrize("points_table", [DEFAULT_POINTS_TABLE, (3, 2, 1)])
+def test_ranking_board_matches_score_sport(seed, is_team, lower_is_better, tolerance, points_table):
+    rng = random.Random(seed)
+    scoring = SportScoring(
+        sport_type_id=1, name="Вид спорта", is_team=is_team, lower_is_better=lower_is_better,
+        tie_tolerance=tolerance, points_table=points_table
+    )
+    rows = {}
+    for performance_id in range(1, 81):
+        if rows and rng.random() < 0.35:
+            # Удаление: таблица загружается до удаления строки, как в delete_performance
+            row = rows[rng.choice(list(rows))]
+            board = board_from_rows(rows.values(), row.gender, scoring)
+            del rows[row.id]
+            changed = board.remove(row.id)
+        else:
+            result_value = normalize_result(rng.choice(TIME_RESULTS), rng.choice(ORIGINAL_RESULTS), scoring)
+            row = Row(performance_id, result_value, None, rng.choice(list(Gender)), rng.randint(1, 5))
+            board = board_from_rows(rows.values(), row.gender, scoring, rank_key(result_value))
+            rows[row.id] = row
+            changed = board.insert(row.id, row.faculty_id, rank_key(result_value))
+
+        for changed_id, points in changed.items():
+            rows[changed_id] = rows[changed_id]._replace(points=points)
+        # После записи только изменившихся баллов полный пересчет ничего не меняет
+        assert score_sport(FakeSession(list(rows.values())), 1, scoring) == {}
@@ -0,0 +1,87 @@
+# backend/tests/test_results_queries.py - число запросов к БД у протоколов и рейтингов
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.bench.generate import generate, load, score
+from app.database import SessionLocal, engine
+from app.utils.reference_data import reference_data
+from app.utils.sport_registry import sport_registry
+from app.utils.standings_cache import standings_cache
+
+# Генератор загружает таблицы через COPY
+pytestmark = pytest.mark.skipif(
+    engine.dialect.name != "postgresql", reason="генератор данных работает только с PostgreSQL"
+)
+
+# Размеры данных: число запросов не должно зависеть от числа факультетов, студентов и выступлений
+DATASETS = {
+    "small": dict(faculties=3, groups_per_faculty=2, students=120, sports=8),
+    "large": dict(faculties=12, groups_per_faculty=4, students=2000, sports=16),
+}
+
+# Виды спорта из шаблонов generate: бег (время), шахматы (очки), баскетбол (командный)
+RUNNING, CHESS, BASKETBALL = 1, 4, 6
+
+PATHS = (
+    f"/api/results/competition-results/?sport_type_id={RUNNING}",
+    f"/api/results/competition-results/?sport_type_id={RUNNING}&gender=М",
+    f"/api/results/competition-results/?sport_type_id={CHESS}",
+    f"/api/results/competition-results/?sport_type_id={BASKETBALL}",
+    f"/api/results/competition-results/?sport_type_id={BASKETBALL}&gender=Ж",
+    "/api/results/faculty-sport-rating/",
+    "/api/results/faculty-sport-rating/?gender=М",
+    f"/api/results/faculty-sport-rating/?sport_type_id={RUNNING}",
+    f"/api/results/faculty-sport-rating/?sport_type_id={BASKETBALL}&gender=Ж",
+    "/api/results/spartakiada-rating/",
+)
+
+
+def seed(faculties, groups_per_faculty, students, sports):
+    load(generate(
+        faculties, groups_per_faculty, students, sports,
+        judges=sports, team_size=4, participation=0.3, seed=42
+    ))
+    score(sports)
+    # Данные загружены в обход сессий приложения: справочники перечитываются явно
+    with SessionLocal() as db:
+        sport_registry.load(db)
+        reference_data.load(db)
+
+
+@contextmanager
+def count_queries():
+    """Считать запросы всех движков (основного, асинхронного и реплики)"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+
+def query_counts(client):
+    counts = {}
+    for path in PATHS:
+        standings_cache.bump()  # Без кэша: каждый ответ строится запросами к базе
+        with count_queries() as statements:
+            response = client.get(path)
+        assert response.status_code == 200, response.text
+        assert response.json(), path
+        counts[path] = len(statements)
+    return counts
+
+
+def test_results_query_count_does_not_grow_with_data(client):
+    counts = {}
+    for size, dataset in DATASETS.items():
+        seed(**dataset)
+        counts[size] = query_counts(client)
+
+    assert counts["small"] == counts["large"]
@@ -0,0 +1,102 @@
+# backend/tests/test_results_write.py - запись результатов и итоги факультетов
+import random
+
+import pytest
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app.models import (
+    Competition, FacultyCompetitionResult, FacultyStanding, FacultyTotalPoints, Judge, SportType,
+    Student, StudentPerformance
+)
+from app.utils.reference_data import reference_data
+from app.utils.seed_data import seed_database
+from app.utils.sport_registry import sport_registry
+from app.utils.standings_cache import standings_cache
+
+
+@pytest.fixture
+def seeded(client):
+    """Заполненная демонстрационными данными база с пересчитанными баллами"""
+    random.seed(7)
+    seed_database()
+    # Данные заполнены в обход приложения: справочники и кэш сбрасываются явно
+    with SessionLocal() as db:
+        sport_registry.load(db)
+        reference_data.load(db)
+    standings_cache.bump()
+    return client
+
+
+def snapshot():
+    """Баллы выступлений и итоги факультетов"""
+    with SessionLocal() as db:
+        return (
+            dict(db.query(StudentPerformance.id, StudentPerformance.points)),
+            {(row.faculty_id, row.sport_type_id, row.gender): row.total_points for row in db.query(FacultyStanding)},
+            {(row.faculty_id, row.sport_type_id): (row.total_points, row.place)
+             for row in db.query(FacultyCompetitionResult)},
+            {row.faculty_id: (row.total_points, row.overall_place) for row in db.query(FacultyTotalPoints)},
+        )
+
+
+def assert_totals_match_points():
+    """Итоги факультетов равны суммам баллов выступлений"""
+    with SessionLocal() as db:
+        sums = dict(db.query(
+            StudentPerformance.faculty_id, func.sum(StudentPerformance.points)
+        ).filter(StudentPerformance.faculty_id.isnot(None)).group_by(StudentPerformance.faculty_id))
+        totals = dict(db.query(FacultyTotalPoints.faculty_id, FacultyTotalPoints.total_points))
+    assert totals == {faculty_id: sums.get(faculty_id, 0) for faculty_id in totals}
+
+
+def assert_matches_full_recalculation(client):
+    """Инкрементальная запись дает то же, что полный пересчет"""
+    before = snapshot()
+    assert client.post("/api/results/recalculate-points/").status_code == 200
+    assert snapshot() == before
+
+
+def free_entry(is_team):
+    """Вид спорта, соревнование, судья и студент, еще не выступавший в нем"""
+    with SessionLocal() as db:
+        sport_type = next(
+            sport_type for sport_type in db.query(SportType).order_by(SportType.id)
+            if sport_registry.get(db, sport_type.id).is_team == is_team
+        )
+        competition = db.query(Competition).filter(Competition.sport_type_id == sport_type.id).first()
+        taken = db.query(StudentPerformance.student_id).filter(StudentPerformance.competition_id == competition.id)
+        student = db.query(Student).filter(
+            Student.group_id.isnot(None), Student.id.notin_(taken)
+        ).order_by(Student.id).first()
+        return {
+            "student_id": student.id,
+            "sport_type_id": sport_type.id,
+            "competition_id": competition.id,
+            "judge_id": db.query(func.min(Judge.id)).scalar(),
+        }
+
+
+@pytest.mark.parametrize("is_team", [False, True])
+def test_create_and_delete_update_faculty_totals(seeded, is_team):
+    client = seeded
+    body = free_entry(is_team)
+    # Лучший результат вида спорта: сдвигает места и баллы остальных
+    body["original_result"] = 1000.0
+    body["time_result"] = "0:00:01.00"
+
+    response = client.post("/api/results/performances/", json=body)
+    assert response.status_code == 200, response.text
+    performance_id = response.json()["id"]
+    assert_totals_match_points()
+    assert_matches_full_recalculation(client)
+
+    rating = client.get("/api/results/faculty-sport-rating/").json()
+    with SessionLocal() as db:
+        totals = dict(db.query(FacultyTotalPoints.faculty_id, FacultyTotalPoints.total_points))
+    assert {row["faculty_id"]: row["total_points"] for row in rating} == totals
+
+    response = client.delete(f"/api/results/performances/{performance_id}")
+    assert response.status_code == 200, response.text
+    assert_totals_match_points()
+    assert_matches_full_recalculation(client)